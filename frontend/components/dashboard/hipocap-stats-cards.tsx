@@ -14,7 +14,7 @@ interface HipocapStats {
   blocked: number;
   allowed: number;
   review_required: number;
-  by_function: Record<string, { blocked: number; allowed: number; review_required: number; total: number }>;
+  by_function: { name: string; blocked: number; allowed: number; review_required: number; total: number }[];
 }
 
 interface StatCardProps {
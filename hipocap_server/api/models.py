@@ -2,63 +2,170 @@
 Pydantic models for API request/response.
 """
 
-from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field
-from datetime import datetime
+from operator import attrgetter
+from typing import Dict, Any, Optional, List, Annotated, Callable, ClassVar, Literal, Tuple
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter, field_validator
+
+
+# OpenAPI schemas for opaque JSON passthrough fields annotated as Any, so pydantic
+# doesn't walk and copy nested values while the docs still show the JSON shape
+OBJECT_SCHEMA = {"type": "object"}
+OBJECT_LIST_SCHEMA = {"type": "array", "items": {"type": "object"}}
+
+
+def _frozen_example(example: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the lists inside an OpenAPI example into tuples.
+    
+    FastAPI deep-copies the schema (examples included) when building the OpenAPI
+    document; a tuple of immutable values is returned as-is by deepcopy instead of
+    being rebuilt, and still renders as a JSON array. Dicts stay dicts because
+    MappingProxyType cannot be deep-copied at all.
+    
+    Args:
+        example: Example payload
+        
+    Returns:
+        Copy of the example with every list replaced by a tuple
+    """
+    def freeze(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: freeze(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return tuple(freeze(item) for item in value)
+        return value
+    
+    return freeze(example)
+
+
+class TrustedORMModel(BaseModel):
+    """
+    Base for response models built from ORM rows that were validated on write.
+    
+    from_orm_trusted skips pydantic validation entirely; use model_validate for
+    anything that does not come from the database.
+    """
+    
+    # Datetime columns exposed as ISO strings ("" when a required value is missing)
+    iso_fields: ClassVar[Tuple[str, ...]] = ()
+    
+    # Bound once per subclass by __pydantic_init_subclass__: field names, a getter
+    # reading them all from a row in one C call, and (iso field, required) pairs
+    orm_fields: ClassVar[Tuple[str, ...]] = ()
+    orm_getter: ClassVar[Optional[Callable[[Any], Tuple[Any, ...]]]] = None
+    iso_required: ClassVar[Tuple[Tuple[str, bool], ...]] = ()
+    
+    # Fixed-shape rows: reject unknown keys and never revalidate nested instances
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="forbid",
+        revalidate_instances="never",
+        validate_assignment=False
+    )
+    
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls.orm_fields = tuple(cls.model_fields)
+        if len(cls.orm_fields) > 1:
+            cls.orm_getter = attrgetter(*cls.orm_fields)
+        elif cls.orm_fields:
+            # attrgetter returns a bare value rather than a 1-tuple for a single name
+            single = attrgetter(cls.orm_fields[0])
+            cls.orm_getter = lambda obj: (single(obj),)
+        cls.iso_required = tuple(
+            (name, cls.model_fields[name].is_required()) for name in cls.iso_fields
+        )
+    
+    @classmethod
+    def from_orm_trusted(cls, obj: Any):
+        """
+        Build the model from an ORM row without running validation.
+        
+        Args:
+            obj: SQLAlchemy model instance with an attribute per field
+            
+        Returns:
+            Model instance built with model_construct
+        """
+        try:
+            values = dict(zip(cls.orm_fields, cls.orm_getter(obj)))
+        except AttributeError:
+            values = {name: getattr(obj, name, None) for name in cls.orm_fields}
+        for name, required in cls.iso_required:
+            value = values[name]
+            values[name] = value.isoformat() if value else ("" if required else None)
+        return cls.model_construct(**values)
+
+
+_EXAMPLE_ANALYZE_REQUEST = _frozen_example({
+    "function_name": "get_mail",
+    "function_result": {"status": "success", "message": "Email retrieved"},
+    "function_args": {"mailbox": "inbox", "limit": 10},
+    "user_query": "Check my emails",
+    "user_role": "user",
+    "target_function": None,
+    "input_analysis": True,
+    "llm_analysis": True,
+    "quarantine_analysis": False,
+    "enable_keyword_detection": True
+})
 
 
 class AnalyzeRequest(BaseModel):
     """Request model for analyze endpoint."""
     
-    function_name: str = Field(..., description="Name of the function to analyze")
-    function_result: Any = Field(..., description="Result from the function call")
-    function_args: Optional[Any] = Field(None, description="Arguments passed to the function call")
-    user_query: Optional[str] = Field(None, description="Optional user query for context")
-    user_role: Optional[str] = Field(None, description="Optional user role for RBAC checking")
-    target_function: Optional[str] = Field(None, description="Optional target function for function chaining checks")
-    input_analysis: bool = Field(True, description="Whether to run input analysis (Stage 1: Prompt Guard)")
-    llm_analysis: bool = Field(False, description="Whether to run LLM analysis agent (Stage 2: Structured LLM analysis)")
-    quarantine_analysis: bool = Field(False, description="Whether to run quarantine analysis (Stage 3: Two-stage infection simulation and evaluation)")
-    quick_analysis: bool = Field(False, description="If True, uses quick mode for LLM analysis (simplified output). If False, uses full detailed analysis with threat indicators, detected patterns, and function call attempts.")
-    enable_keyword_detection: bool = Field(False, description="Whether to enable keyword detection for sensitive keywords")
-    keywords: Optional[List[str]] = Field(None, description="Optional custom list of keywords to detect (if not provided, uses default sensitive keywords)")
-    openai_model: Optional[str] = Field(None, description="OpenAI model name used for the LLM call (extracted from OpenTelemetry context)")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "function_name": "get_mail",
-                "function_result": {"status": "success", "message": "Email retrieved"},
-                "function_args": {"mailbox": "inbox", "limit": 10},
-                "user_query": "Check my emails",
-                "user_role": "user",
-                "target_function": None,
-                "input_analysis": True,
-                "llm_analysis": True,
-                "quarantine_analysis": False,
-                "enable_keyword_detection": True
-            }
-        }
+    function_name: str
+    function_result: Any
+    function_args: Optional[Any] = None
+    user_query: Optional[str] = None
+    user_role: Optional[str] = None
+    target_function: Optional[str] = None
+    input_analysis: bool = True
+    llm_analysis: bool = False
+    quarantine_analysis: bool = False
+    quick_analysis: bool = False
+    enable_keyword_detection: bool = False
+    keywords: Optional[List[str]] = None
+    openai_model: Optional[str] = None
+    
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_ANALYZE_REQUEST})
 
 
 class AnalyzeResponse(BaseModel):
     """Response model for analyze endpoint."""
     
-    final_decision: str = Field(..., description="Final decision: ALLOWED, BLOCKED, REVIEW_REQUIRED, or ALLOWED_WITH_WARNING")
-    final_score: Optional[float] = Field(None, description="Final risk score (0.0-1.0) from the analysis")
-    safe_to_use: bool = Field(..., description="Whether the function result is safe to use")
-    blocked_at: Optional[str] = Field(None, description="Stage where blocking occurred (if any)")
-    reason: Optional[str] = Field(None, description="Reason for blocking or decision")
-    input_analysis: Optional[Dict[str, Any]] = Field(None, description="Input analysis results")
-    quarantine_analysis: Optional[Dict[str, Any]] = Field(None, description="Quarantine analysis results")
-    llm_analysis: Optional[Dict[str, Any]] = Field(None, description="LLM analysis results")
-    rbac_blocked: Optional[bool] = Field(None, description="Whether blocked by RBAC")
-    chaining_blocked: Optional[bool] = Field(None, description="Whether blocked by function chaining rules")
-    severity_rule: Optional[Dict[str, Any]] = Field(None, description="Severity rule that was applied")
-    output_restriction: Optional[Dict[str, Any]] = Field(None, description="Output restriction that was applied")
-    context_rule: Optional[Dict[str, Any]] = Field(None, description="Context rule that was applied")
-    warning: Optional[str] = Field(None, description="Warning message if any")
-    function_chaining_info: Optional[Dict[str, Any]] = Field(None, description="Function chaining configuration showing which functions can/cannot be called from this function's output")
+    final_decision: str
+    final_score: Optional[float] = None
+    safe_to_use: bool
+    blocked_at: Optional[str] = None
+    reason: Optional[str] = None
+    input_analysis: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    quarantine_analysis: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    llm_analysis: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    rbac_blocked: Optional[bool] = None
+    chaining_blocked: Optional[bool] = None
+    severity_rule: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    output_restriction: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    context_rule: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    warning: Optional[str] = None
+    function_chaining_info: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+
+
+_EXAMPLE_RBAC_UPDATE_REQUEST = _frozen_example({
+    "roles": {
+        "developer": {
+            "permissions": ["get_mail", "search_web", "summarize_text"],
+            "description": "Developer role with specific permissions"
+        }
+    },
+    "functions": {
+        "custom_function": {
+            "allowed_roles": ["developer", "admin"],
+            "description": "Custom function for developers"
+        }
+    }
+})
 
 
 class RBACUpdateRequest(BaseModel):
@@ -67,23 +174,7 @@ class RBACUpdateRequest(BaseModel):
     roles: Optional[Dict[str, Any]] = Field(None, description="Roles to add or update")
     functions: Optional[Dict[str, Any]] = Field(None, description="Function configurations to add or update")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "roles": {
-                    "developer": {
-                        "permissions": ["get_mail", "search_web", "summarize_text"],
-                        "description": "Developer role with specific permissions"
-                    }
-                },
-                "functions": {
-                    "custom_function": {
-                        "allowed_roles": ["developer", "admin"],
-                        "description": "Custom function for developers"
-                    }
-                }
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_RBAC_UPDATE_REQUEST})
 
 
 class RBACUpdateResponse(BaseModel):
@@ -93,6 +184,8 @@ class RBACUpdateResponse(BaseModel):
     message: str = Field(..., description="Status message")
     roles_count: int = Field(..., description="Number of roles after update")
     functions_count: int = Field(..., description="Number of functions after update")
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 # Authentication models
@@ -100,14 +193,27 @@ class UserCreate(BaseModel):
     """Request model for user creation."""
     
     username: str = Field(..., min_length=3, max_length=100)
-    email: str = Field(..., pattern=r'^[^@]+@[^@]+\.[^@]+$')
+    email: str
     password: str = Field(..., min_length=8)
     is_admin: bool = Field(False, description="Whether user is an admin")
+    
+    @field_validator("email")
+    @classmethod
+    def _validate_email(cls, value: str) -> str:
+        """Require local@domain.tld with a single '@' (plain string scans instead of a regex)."""
+        local, at, domain = value.partition("@")
+        if not local or not at or "@" in domain or "." not in domain[1:-1]:
+            raise ValueError("Invalid email address")
+        return value
+    
+    model_config = ConfigDict(defer_build=True)
 
 
-class UserResponse(BaseModel):
+class UserResponse(TrustedORMModel):
     """Response model for user."""
     
+    iso_fields: ClassVar[Tuple[str, ...]] = ("created_at",)
+    
     id: int
     username: str
     email: str
@@ -115,8 +221,7 @@ class UserResponse(BaseModel):
     is_admin: bool
     created_at: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(defer_build=True)
 
 
 class LoginRequest(BaseModel):
@@ -124,6 +229,8 @@ class LoginRequest(BaseModel):
     
     username: str
     password: str
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 class LoginResponse(BaseModel):
@@ -132,6 +239,8 @@ class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 class APIKeyCreate(BaseModel):
@@ -139,11 +248,15 @@ class APIKeyCreate(BaseModel):
     
     name: str = Field(..., min_length=1, max_length=255, description="Human-readable name for the key")
     expires_days: Optional[int] = Field(None, description="Number of days until expiration (None for no expiration)")
+    
+    model_config = ConfigDict(defer_build=True)
 
 
-class APIKeyResponse(BaseModel):
+class APIKeyResponse(TrustedORMModel):
     """Response model for API key (without the actual key)."""
     
+    iso_fields: ClassVar[Tuple[str, ...]] = ("last_used_at", "expires_at", "created_at")
+    
     id: int
     name: str
     is_active: bool
@@ -151,8 +264,7 @@ class APIKeyResponse(BaseModel):
     expires_at: Optional[str]
     created_at: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(defer_build=True)
 
 
 class APIKeyCreateResponse(BaseModel):
@@ -164,6 +276,14 @@ class APIKeyCreateResponse(BaseModel):
     expires_at: Optional[str]
     created_at: str
     message: str = Field("Save this key securely. It will not be shown again.")
+    
+    model_config = ConfigDict(
+        defer_build=True,
+        from_attributes=True,
+        extra="forbid",
+        revalidate_instances="never",
+        validate_assignment=False
+    )
 
 
 # Policy models
@@ -173,40 +293,51 @@ class PolicyCreate(BaseModel):
     policy_key: str = Field(..., min_length=1, max_length=255, description="Unique identifier for the policy")
     name: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
-    roles: Optional[Dict[str, Any]] = None
-    functions: Optional[Dict[str, Any]] = None
-    severity_rules: Optional[Dict[str, Any]] = None
-    output_restrictions: Optional[Dict[str, Any]] = None
-    function_chaining: Optional[Dict[str, Any]] = None
-    context_rules: Optional[List[Dict[str, Any]]] = None
-    decision_thresholds: Optional[Dict[str, Any]] = None
-    custom_prompts: Optional[Dict[str, str]] = None
+    roles: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    functions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    severity_rules: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    output_restrictions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    function_chaining: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    context_rules: Any = Field(default_factory=list, json_schema_extra=OBJECT_LIST_SCHEMA)
+    decision_thresholds: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    custom_prompts: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
     is_default: bool = Field(False, description="Set as default policy")
 
 
-class PolicyResponse(BaseModel):
+class PolicyResponse(TrustedORMModel):
     """Response model for policy."""
     
+    iso_fields: ClassVar[Tuple[str, ...]] = ("created_at", "updated_at")
+    
     id: int
     policy_key: str
     name: str
     description: Optional[str] = None
     owner_id: str  # Changed to UUID string (LMNR user ID)
-    roles: Optional[Dict[str, Any]] = None
-    functions: Optional[Dict[str, Any]] = None
-    severity_rules: Optional[Dict[str, Any]] = None
-    output_restrictions: Optional[Dict[str, Any]] = None
-    function_chaining: Optional[Dict[str, Any]] = None
-    context_rules: Optional[List[Dict[str, Any]]] = None
-    decision_thresholds: Optional[Dict[str, Any]] = None
-    custom_prompts: Optional[Dict[str, str]] = None
+    roles: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    functions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    severity_rules: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    output_restrictions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    function_chaining: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    context_rules: Any = Field(None, json_schema_extra=OBJECT_LIST_SCHEMA)
+    decision_thresholds: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
+    custom_prompts: Any = Field(None, json_schema_extra=OBJECT_SCHEMA)
     is_active: bool
     is_default: bool
     created_at: str
     updated_at: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
+
+
+_EXAMPLE_POLICY_UPDATE = _frozen_example({
+    "name": "Updated Policy Name",
+    "description": "Updated description",
+    "functions": {
+        "send_mail": {
+            "allowed_roles": ["developer"],
+            "quarantine_exclude": "Exclude anything with a mail address"
+        }
+    }
+})
 
 
 class PolicyUpdate(BaseModel):
@@ -214,30 +345,82 @@ class PolicyUpdate(BaseModel):
     
     name: Optional[str] = Field(None, description="Policy name")
     description: Optional[str] = Field(None, description="Policy description")
-    roles: Optional[Dict[str, Any]] = Field(None, description="Roles configuration (will merge with existing)")
-    functions: Optional[Dict[str, Any]] = Field(None, description="Functions configuration (will merge with existing)")
-    severity_rules: Optional[Dict[str, Any]] = Field(None, description="Severity rules (will merge with existing)")
-    output_restrictions: Optional[Dict[str, Any]] = Field(None, description="Output restrictions (will merge with existing)")
-    function_chaining: Optional[Dict[str, Any]] = Field(None, description="Function chaining rules (will merge with existing)")
-    context_rules: Optional[List[Dict[str, Any]]] = Field(None, description="Context rules (will replace existing)")
-    decision_thresholds: Optional[Dict[str, Any]] = Field(None, description="Decision thresholds (will merge with existing)")
-    custom_prompts: Optional[Dict[str, str]] = Field(None, description="Custom prompts configuration (will merge with existing)")
+    roles: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Roles configuration (will merge with existing)")
+    functions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Functions configuration (will merge with existing)")
+    severity_rules: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Severity rules (will merge with existing)")
+    output_restrictions: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Output restrictions (will merge with existing)")
+    function_chaining: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Function chaining rules (will merge with existing)")
+    context_rules: Any = Field(None, json_schema_extra=OBJECT_LIST_SCHEMA, description="Context rules (will replace existing)")
+    decision_thresholds: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Decision thresholds (will merge with existing)")
+    custom_prompts: Any = Field(None, json_schema_extra=OBJECT_SCHEMA, description="Custom prompts configuration (will merge with existing)")
     is_active: Optional[bool] = Field(None, description="Whether policy is active")
     is_default: Optional[bool] = Field(None, description="Whether this is the default policy")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "name": "Updated Policy Name",
-                "description": "Updated description",
-                "functions": {
-                    "send_mail": {
-                        "allowed_roles": ["developer"],
-                        "quarantine_exclude": "Exclude anything with a mail address"
-                    }
-                }
-            }
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_POLICY_UPDATE})
+
+
+POLICY_OBJECT_SECTIONS = (
+    "roles",
+    "functions",
+    "severity_rules",
+    "output_restrictions",
+    "function_chaining",
+    "decision_thresholds",
+)
+
+
+def validate_policy_structure(data: Any) -> None:
+    """
+    Check the shape of the policy sections on a PolicyCreate or PolicyUpdate.
+
+    The sections are declared as Any so pydantic does not walk them on every
+    request; routes call this once the caller has been authenticated.
+
+    Args:
+        data: PolicyCreate or PolicyUpdate instance
+
+    Raises:
+        ValueError: If a section does not have the expected JSON shape
+    """
+    for section in POLICY_OBJECT_SECTIONS:
+        value = getattr(data, section)
+        if value is not None and type(value) is not dict:
+            raise ValueError(f"{section} must be an object")
+
+    context_rules = data.context_rules
+    if context_rules is not None:
+        if type(context_rules) is not list:
+            raise ValueError("context_rules must be a list of objects")
+        for rule in context_rules:
+            if type(rule) is not dict:
+                raise ValueError("context_rules must be a list of objects")
+
+    custom_prompts = data.custom_prompts
+    if custom_prompts is not None:
+        if type(custom_prompts) is not dict:
+            raise ValueError("custom_prompts must be an object")
+        for prompt in custom_prompts.values():
+            if type(prompt) is not str:
+                raise ValueError("custom_prompts values must be strings")
+
+
+_EXAMPLE_POLICY_UPDATE_RESPONSE = _frozen_example({
+    "success": True,
+    "policy": {
+        "id": 1,
+        "policy_key": "my_policy",
+        "name": "Updated Policy"
+    },
+    "changes": {
+        "name": {"old": "Old Name", "new": "Updated Policy"},
+        "functions": {
+            "added": ["send_mail"],
+            "updated": ["get_mail"],
+            "removed": []
         }
+    },
+    "warnings": []
+})
 
 
 class PolicyUpdateResponse(BaseModel):
@@ -245,35 +428,18 @@ class PolicyUpdateResponse(BaseModel):
     
     success: bool = Field(..., description="Whether the update was successful")
     policy: PolicyResponse = Field(..., description="Updated policy")
-    changes: Dict[str, Any] = Field(..., description="Detailed information about what changed")
+    changes: Any = Field(..., json_schema_extra=OBJECT_SCHEMA, description="Detailed information about what changed")
     warnings: Optional[List[str]] = Field(None, description="Any warnings during update")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "policy": {
-                    "id": 1,
-                    "policy_key": "my_policy",
-                    "name": "Updated Policy"
-                },
-                "changes": {
-                    "name": {"old": "Old Name", "new": "Updated Policy"},
-                    "functions": {
-                        "added": ["send_mail"],
-                        "updated": ["get_mail"],
-                        "removed": []
-                    }
-                },
-                "warnings": []
-            }
-        }
+    model_config = ConfigDict(defer_build=True, json_schema_extra={"example": _EXAMPLE_POLICY_UPDATE_RESPONSE})
 
 
 # Analysis Trace Models
-class AnalysisTraceResponse(BaseModel):
+class AnalysisTraceResponse(TrustedORMModel):
     """Response model for analysis trace."""
     
+    iso_fields: ClassVar[Tuple[str, ...]] = ("reviewed_at", "created_at", "updated_at")
+    
     id: int
     user_id: str  # Changed to string (UUID) to match database schema
     api_key_id: Optional[str] = None  # Changed to string to match database schema
@@ -284,7 +450,7 @@ class AnalysisTraceResponse(BaseModel):
     require_quarantine: bool
     quick_analysis: bool
     policy_key: Optional[str] = None
-    analysis_response: Dict[str, Any]
+    analysis_response: Any = Field(..., json_schema_extra=OBJECT_SCHEMA)
     final_decision: str
     safe_to_use: bool
     blocked_at: Optional[str] = None
@@ -296,15 +462,18 @@ class AnalysisTraceResponse(BaseModel):
     llm_score: Optional[float] = None
     review_status: str
     reviewed_by: Optional[str] = None  # Changed to string (UUID) to match database schema
-    reviewed_at: Optional[datetime] = None
+    reviewed_at: Optional[str] = None
     review_notes: Optional[str] = None
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-    
-    class Config:
-        from_attributes = True
+    created_at: str
+    updated_at: Optional[str] = None
+
+
+_EXAMPLE_REVIEW_UPDATE_REQUEST = _frozen_example({
+    "status": "approved",
+    "notes": "Content reviewed and approved for use"
+})
 
 
 class ReviewUpdateRequest(BaseModel):
@@ -313,13 +482,19 @@ class ReviewUpdateRequest(BaseModel):
     status: str = Field(..., description="Review status: approved, rejected, or reviewed")
     notes: Optional[str] = Field(None, description="Optional review notes")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "approved",
-                "notes": "Content reviewed and approved for use"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_REVIEW_UPDATE_REQUEST})
+
+
+_EXAMPLE_REVIEW_UPDATE_RESPONSE = _frozen_example({
+    "success": True,
+    "message": "Review status updated successfully",
+    "trace": {
+        "id": 1,
+        "review_status": "approved",
+        "reviewed_by": 1,
+        "reviewed_at": "2024-01-15T10:30:00Z"
+    }
+})
 
 
 class ReviewUpdateResponse(BaseModel):
@@ -329,19 +504,15 @@ class ReviewUpdateResponse(BaseModel):
     message: str = Field(..., description="Status message")
     trace: AnalysisTraceResponse = Field(..., description="Updated trace")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "message": "Review status updated successfully",
-                "trace": {
-                    "id": 1,
-                    "review_status": "approved",
-                    "reviewed_by": 1,
-                    "reviewed_at": "2024-01-15T10:30:00Z"
-                }
-            }
-        }
+    model_config = ConfigDict(defer_build=True, json_schema_extra={"example": _EXAMPLE_REVIEW_UPDATE_RESPONSE})
+
+
+_EXAMPLE_TRACE_LIST_RESPONSE = _frozen_example({
+    "traces": [],
+    "total": 100,
+    "limit": 50,
+    "offset": 0
+})
 
 
 class TraceListResponse(BaseModel):
@@ -352,15 +523,17 @@ class TraceListResponse(BaseModel):
     limit: int = Field(..., description="Limit used")
     offset: int = Field(..., description="Offset used")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "traces": [],
-                "total": 100,
-                "limit": 50,
-                "offset": 0
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_TRACE_LIST_RESPONSE})
+
+
+class FunctionStatBucket(BaseModel):
+    """Trace counts for a single function."""
+    
+    name: str = Field(..., description="Function name")
+    blocked: int = Field(0, description="Number of blocked traces")
+    allowed: int = Field(0, description="Number of allowed traces")
+    review_required: int = Field(0, description="Number of traces requiring review")
+    total: int = Field(0, description="Total number of traces")
 
 
 class TraceStatsResponse(BaseModel):
@@ -370,10 +543,12 @@ class TraceStatsResponse(BaseModel):
     blocked: int = Field(..., description="Number of blocked traces")
     allowed: int = Field(..., description="Number of allowed traces")
     review_required: int = Field(..., description="Number of traces requiring review")
-    by_function: Dict[str, Dict[str, int]] = Field(
-        default_factory=dict,
-        description="Statistics grouped by function name"
+    by_function: List[FunctionStatBucket] = Field(
+        default_factory=list,
+        description="Statistics per function name, one bucket per function"
     )
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 class TraceTimeSeriesDataPoint(BaseModel):
@@ -382,37 +557,65 @@ class TraceTimeSeriesDataPoint(BaseModel):
     timestamp: str = Field(..., description="ISO timestamp")
     blocked: int = Field(..., description="Number of blocked functions in this interval")
     allowed: int = Field(..., description="Number of allowed functions in this interval")
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 class TraceTimeSeriesResponse(BaseModel):
     """Response model for time-series trace statistics."""
     
     items: List[TraceTimeSeriesDataPoint] = Field(..., description="Time-series data points")
+    
+    model_config = ConfigDict(defer_build=True)
 
 
 # Shield models
+class ShieldContent(BaseModel):
+    """Shield rules, stored as separate columns on the shield."""
+    
+    prompt_description: str = Field(..., min_length=1)
+    what_to_block: str = Field(..., min_length=1)
+    what_not_to_block: str
+
+
+def _parse_shield_content(value: Any) -> Any:
+    """Accept content sent as a JSON string (legacy clients) by parsing it in pydantic-core."""
+    if isinstance(value, str):
+        return ShieldContent.model_validate_json(value)
+    return value
+
+
+ShieldContentInput = Annotated[ShieldContent, BeforeValidator(_parse_shield_content)]
+
+
+_EXAMPLE_SHIELD_CREATE = _frozen_example({
+    "shield_key": "email_shield",
+    "name": "Email Protection Shield",
+    "description": "Shield to protect against email-based prompt injection",
+    "content": {
+        "prompt_description": "Email content analysis",
+        "what_to_block": "Suspicious email patterns",
+        "what_not_to_block": "Legitimate email content"
+    }
+})
+
+
 class ShieldCreate(BaseModel):
     """Request model for shield creation."""
     
     shield_key: str = Field(..., min_length=1, max_length=255, description="Unique identifier for the shield")
     name: str = Field(..., min_length=1, max_length=255, description="Human-readable name")
     description: Optional[str] = Field(None, description="Optional description")
-    content: str = Field(..., description="JSON string containing prompt_description, what_to_block, what_not_to_block")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "shield_key": "email_shield",
-                "name": "Email Protection Shield",
-                "description": "Shield to protect against email-based prompt injection",
-                "content": '{"prompt_description": "Email content analysis", "what_to_block": "Suspicious email patterns", "what_not_to_block": "Legitimate email content"}'
-            }
-        }
+    content: ShieldContentInput = Field(..., description="prompt_description, what_to_block and what_not_to_block (an object, or the same as a JSON string)")
+    
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_SHIELD_CREATE})
 
 
-class ShieldResponse(BaseModel):
+class ShieldResponse(TrustedORMModel):
     """Response model for shield."""
     
+    iso_fields: ClassVar[Tuple[str, ...]] = ("created_at", "updated_at")
+    
     id: int
     shield_key: str
     name: str
@@ -424,9 +627,17 @@ class ShieldResponse(BaseModel):
     is_active: bool
     created_at: str
     updated_at: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
+
+
+_EXAMPLE_SHIELD_UPDATE = _frozen_example({
+    "name": "Updated Shield Name",
+    "description": "Updated description",
+    "content": {
+        "prompt_description": "Updated description",
+        "what_to_block": "Updated blocking rules",
+        "what_not_to_block": "Updated exceptions"
+    }
+})
 
 
 class ShieldUpdate(BaseModel):
@@ -434,17 +645,26 @@ class ShieldUpdate(BaseModel):
     
     name: Optional[str] = Field(None, description="Shield name")
     description: Optional[str] = Field(None, description="Shield description")
-    content: Optional[str] = Field(None, description="JSON string containing prompt_description, what_to_block, what_not_to_block")
+    content: Optional[ShieldContentInput] = Field(None, description="prompt_description, what_to_block and what_not_to_block (an object, or the same as a JSON string)")
     is_active: Optional[bool] = Field(None, description="Whether shield is active")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "name": "Updated Shield Name",
-                "description": "Updated description",
-                "content": '{"prompt_description": "Updated description", "what_to_block": "Updated blocking rules", "what_not_to_block": "Updated exceptions"}'
-            }
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_SHIELD_UPDATE})
+
+
+_EXAMPLE_SHIELD_UPDATE_RESPONSE = _frozen_example({
+    "success": True,
+    "shield": {
+        "id": 1,
+        "shield_key": "email_shield",
+        "name": "Updated Shield"
+    },
+    "changes": {
+        "name": {"old": "Old Name", "new": "Updated Shield"},
+        "content": {
+            "what_to_block": {"old": "Old rules", "new": "New rules"}
         }
+    }
+})
 
 
 class ShieldUpdateResponse(BaseModel):
@@ -452,56 +672,133 @@ class ShieldUpdateResponse(BaseModel):
     
     success: bool = Field(..., description="Whether the update was successful")
     shield: ShieldResponse = Field(..., description="Updated shield")
-    changes: Dict[str, Any] = Field(..., description="Detailed information about what changed")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "shield": {
-                    "id": 1,
-                    "shield_key": "email_shield",
-                    "name": "Updated Shield"
-                },
-                "changes": {
-                    "name": {"old": "Old Name", "new": "Updated Shield"},
-                    "content": {
-                        "what_to_block": {"old": "Old rules", "new": "New rules"}
-                    }
-                }
-            }
-        }
+    changes: Any = Field(..., json_schema_extra=OBJECT_SCHEMA, description="Detailed information about what changed")
+    
+    model_config = ConfigDict(defer_build=True, json_schema_extra={"example": _EXAMPLE_SHIELD_UPDATE_RESPONSE})
 
 
 # Shield Analysis Models
+_EXAMPLE_SHIELD_ANALYZE_REQUEST = _frozen_example({
+    "content": "This is the text content to analyze. It can be any input from the user.",
+    "user_query": "Optional context about what the user was trying to do",
+    "require_reason": True
+})
+
+
 class ShieldAnalyzeRequest(BaseModel):
     """Request model for shield-based analysis."""
     
-    content: str = Field(..., description="The text content to analyze (can be any input - email content, document text, user message, etc.)")
-    user_query: Optional[str] = Field(None, description="Optional user query for context")
-    require_reason: bool = Field(False, description="If True, include a one-liner reason for the decision")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "content": "This is the text content to analyze. It can be any input from the user.",
-                "user_query": "Optional context about what the user was trying to do",
-                "require_reason": True
-            }
-        }
+    content: str
+    user_query: Optional[str] = None
+    require_reason: bool = False
+    
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_SHIELD_ANALYZE_REQUEST})
+
+
+_EXAMPLE_SHIELD_ANALYZE_RESPONSE = _frozen_example({
+    "decision": "BLOCK",
+    "reason": "Content contains suspicious patterns matching blocked criteria"
+})
 
 
 class ShieldAnalyzeResponse(BaseModel):
     """Response model for shield-based analysis."""
     
-    decision: str = Field(..., description="Final decision: BLOCK or ALLOW")
-    reason: Optional[str] = Field(None, description="One-liner reason for the decision (only if require_reason=True)")
+    decision: Literal["BLOCK", "ALLOW"]
+    reason: Optional[str] = None
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "decision": "BLOCK",
-                "reason": "Content contains suspicious patterns matching blocked criteria"
-            }
-        }
-
+    model_config = ConfigDict(json_schema_extra={"example": _EXAMPLE_SHIELD_ANALYZE_RESPONSE})
+
+
+# Field documentation for the per-request models, kept out of their FieldInfo and
+# merged into the OpenAPI document once by apply_field_descriptions
+FIELD_DESCRIPTIONS: Dict[str, Dict[str, str]] = {
+    "AnalyzeRequest": {
+        "function_name": "Name of the function to analyze",
+        "function_result": "Result from the function call",
+        "function_args": "Arguments passed to the function call",
+        "user_query": "Optional user query for context",
+        "user_role": "Optional user role for RBAC checking",
+        "target_function": "Optional target function for function chaining checks",
+        "input_analysis": "Whether to run input analysis (Stage 1: Prompt Guard)",
+        "llm_analysis": "Whether to run LLM analysis agent (Stage 2: Structured LLM analysis)",
+        "quarantine_analysis": "Whether to run quarantine analysis (Stage 3: Two-stage infection simulation and evaluation)",
+        "quick_analysis": "If True, uses quick mode for LLM analysis (simplified output). If False, uses full detailed analysis with threat indicators, detected patterns, and function call attempts.",
+        "enable_keyword_detection": "Whether to enable keyword detection for sensitive keywords",
+        "keywords": "Optional custom list of keywords to detect (if not provided, uses default sensitive keywords)",
+        "openai_model": "OpenAI model name used for the LLM call (extracted from OpenTelemetry context)"
+    },
+    "AnalyzeResponse": {
+        "final_decision": "Final decision: ALLOWED, BLOCKED, REVIEW_REQUIRED, or ALLOWED_WITH_WARNING",
+        "final_score": "Final risk score (0.0-1.0) from the analysis",
+        "safe_to_use": "Whether the function result is safe to use",
+        "blocked_at": "Stage where blocking occurred (if any)",
+        "reason": "Reason for blocking or decision",
+        "input_analysis": "Input analysis results",
+        "quarantine_analysis": "Quarantine analysis results",
+        "llm_analysis": "LLM analysis results",
+        "rbac_blocked": "Whether blocked by RBAC",
+        "chaining_blocked": "Whether blocked by function chaining rules",
+        "severity_rule": "Severity rule that was applied",
+        "output_restriction": "Output restriction that was applied",
+        "context_rule": "Context rule that was applied",
+        "warning": "Warning message if any",
+        "function_chaining_info": "Function chaining configuration showing which functions can/cannot be called from this function's output"
+    },
+    "ShieldAnalyzeRequest": {
+        "content": "The text content to analyze (can be any input - email content, document text, user message, etc.)",
+        "user_query": "Optional user query for context",
+        "require_reason": "If True, include a one-liner reason for the decision"
+    },
+    "ShieldAnalyzeResponse": {
+        "decision": "Final decision: BLOCK or ALLOW",
+        "reason": "One-liner reason for the decision (only if require_reason=True)"
+    }
+}
+
+
+def apply_field_descriptions(openapi_schema: Dict[str, Any]) -> None:
+    """
+    Copy FIELD_DESCRIPTIONS into the component schemas of a generated OpenAPI document.
+    
+    Args:
+        openapi_schema: OpenAPI document generated by FastAPI, updated in place
+    """
+    schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for schema_name, schema in schemas.items():
+        # FastAPI suffixes split request/response schemas with -Input/-Output
+        descriptions = FIELD_DESCRIPTIONS.get(schema_name.partition("-")[0])
+        if not descriptions:
+            continue
+        properties = schema.get("properties", {})
+        for field_name, description in descriptions.items():
+            if field_name in properties:
+                properties[field_name]["description"] = description
+
+
+# Prebuilt adapters for list payloads, so the list validator/serializer is built once
+# at import instead of per request
+TRACE_LIST_ADAPTER = TypeAdapter(List[AnalysisTraceResponse])
+POLICY_LIST_ADAPTER = TypeAdapter(List[PolicyResponse])
+
+
+# Every API model, including the ones built lazily (defer_build) because they are
+# rarely used; warmup_models builds whatever is still pending once at startup so
+# the first request doesn't pay for it
+API_MODELS = tuple(
+    value for value in list(globals().values())
+    if isinstance(value, type) and issubclass(value, BaseModel) and value.__module__ == __name__
+)
+
+
+def warmup_models() -> None:
+    """
+    Build the validators/serializers of all API models that are not built yet.
+    
+    Models without defer_build are already complete after import and are skipped;
+    model_rebuild raises if a model cannot be completed, so a broken model fails
+    startup instead of its first request.
+    """
+    for model in API_MODELS:
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
@@ -2,34 +2,94 @@
 API route handlers for hipocap-v1 server.
 """
 
-from typing import Dict, Any, Optional, List
-from fastapi import APIRouter, HTTPException, Depends, Query, Request, Header
+from typing import Dict, Any, Optional, List, Callable, Hashable, Tuple
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, Response, Header
 from fastapi import status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from .models import (
     AnalyzeRequest, AnalyzeResponse, RBACUpdateRequest, RBACUpdateResponse,
     AnalysisTraceResponse, ReviewUpdateRequest, ReviewUpdateResponse, TraceListResponse,
-    TraceStatsResponse, TraceTimeSeriesResponse, TraceTimeSeriesDataPoint
+    TraceStatsResponse, TraceTimeSeriesResponse, TRACE_LIST_ADAPTER
 )
 from ..pipeline import GuardPipeline, create_guard_pipeline
 from ..config import Config
 from ..auth.middleware import get_lmnr_user_info, LMNRUserInfo
+from ..auth.lmnr_validator import get_lmnr_user_by_api_key, USER_BY_KEY_CACHE_TTL
 from ..database.repositories.analysis_trace_repository import AnalysisTraceRepository
-from ..database.connection import get_db
+from ..database.repositories.policy_repository import PolicyRepository, PolicySnapshot, POLICY_CACHE
+from ..database.connection import get_db, SessionLocal
+from ..database.trace_writer import TraceWriter
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from dataclasses import dataclass
+import asyncio
+import functools
+import hashlib
+import logging
 import os
-from dotenv import load_dotenv
+import time
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# Default response class for this router; orjson when installed
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Pipeline result keys copied onto AnalyzeResponse
+ANALYZE_RESPONSE_FIELDS = frozenset(AnalyzeResponse.model_fields)
+
+# AnalyzeRequest fields recorded on each analysis trace
+TRACE_REQUEST_FIELDS = frozenset({
+    "function_name",
+    "user_query",
+    "user_role",
+    "target_function",
+    "input_analysis",
+    "llm_analysis",
+    "quarantine_analysis",
+    "quick_analysis",
+    "enable_keyword_detection",
+})
+
+# Dashboard aggregates (/traces/stats, /traces/timeseries) are served from a
+# short-lived per-user cache; new traces show up once the entry expires
+TRACE_STATS_CACHE_TTL = float(os.getenv("TRACE_STATS_CACHE_TTL", "60"))
+TRACE_STATS_CACHE_SIZE = int(os.getenv("TRACE_STATS_CACHE_SIZE", "1024"))
+_trace_stats_cache: Dict[Hashable, Tuple[float, bytes, str]] = {}
+
+# pipeline.analyze (Prompt Guard inference plus LLM calls) runs on its own pool, so a
+# burst of analyses cannot starve the default pool that DB and auth work share
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str((os.cpu_count() or 1) * 2)))
+_analyze_executor = ThreadPoolExecutor(max_workers=ANALYZE_WORKERS, thread_name_prefix="analyze")
+
+# Analysis traces are inserted in batches by a background writer; when it is not
+# running or its queue is full, a trace falls back to its own insert after the response
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "500"))
+TRACE_BATCH_WAIT_MS = float(os.getenv("TRACE_BATCH_WAIT_MS", "200"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+_trace_writer: Optional[TraceWriter] = None
+
+# /health never changes, so its body is encoded once
+_HEALTH_BODY = FastJSONResponse(content={"status": "healthy", "service": "hipocap-v1"}).body
 
 
 # Global pipeline instance (initialized on startup)
 _pipeline: GuardPipeline = None
 
 
-def get_pipeline() -> GuardPipeline:
-    """Get or create the global pipeline instance."""
+async def get_pipeline() -> GuardPipeline:
+    """
+    Get or create the global pipeline instance.
+    
+    Declared async so FastAPI resolves it on the event loop instead of
+    dispatching a global lookup to the threadpool.
+    """
     global _pipeline
     if _pipeline is None:
         raise HTTPException(
@@ -39,6 +99,48 @@ def get_pipeline() -> GuardPipeline:
     return _pipeline
 
 
+@dataclass(frozen=True)
+class PipelineSettings:
+    """Pipeline settings read from the environment (.env is loaded when pipeline.py is imported)."""
+    openai_api_key: Optional[str]
+    openai_base_url: str
+    openai_model: str
+    infection_model: Optional[str]
+    analysis_model: Optional[str]
+    guard_model: str
+    config_path: str
+    hf_token: Optional[str]
+    
+    @classmethod
+    def from_env(cls) -> "PipelineSettings":
+        """Read every pipeline setting from the environment, applying defaults."""
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            openai_base_url=os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1"),
+            openai_model=os.getenv("OPENAI_MODEL", "x-ai/grok-4.1-fast"),
+            infection_model=os.getenv("INFECTION_MODEL"),
+            analysis_model=os.getenv("ANALYSIS_MODEL"),
+            guard_model=os.getenv("GUARD_MODEL", "meta-llama/Prompt-Guard-86M"),
+            config_path=os.getenv("HIPOCAP_CONFIG_PATH", "hipocap_config.json"),
+            hf_token=os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACE_TOKEN")
+        )
+
+
+async def run_analysis(pipeline: GuardPipeline, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Run pipeline.analyze on the dedicated analysis pool.
+    
+    Args:
+        pipeline: Pipeline (or per-request view) to run
+        **kwargs: Arguments for GuardPipeline.analyze
+        
+    Returns:
+        Analysis result dict
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_analyze_executor, functools.partial(pipeline.analyze, **kwargs))
+
+
 def initialize_pipeline(
     openai_api_key: str = None,
     openai_base_url: str = None,
@@ -49,7 +151,7 @@ def initialize_pipeline(
     config_path: str = "hipocap_config.json",
     hf_token: str = None,
     **kwargs
-) -> None:
+) -> GuardPipeline:
     """
     Initialize the global pipeline instance.
     
@@ -63,18 +165,22 @@ def initialize_pipeline(
         config_path: Path to configuration file (or set HIPOCAP_CONFIG_PATH env var)
         hf_token: HuggingFace token for accessing private/gated models (or set HF_TOKEN env var)
         **kwargs: Additional pipeline arguments
+        
+    Returns:
+        The initialized GuardPipeline, shared by all requests
     """
     global _pipeline
     
     # Get from environment if not provided
-    openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-    openai_base_url = openai_base_url or os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1")
-    openai_model = openai_model or os.getenv("OPENAI_MODEL", "x-ai/grok-4.1-fast")
-    infection_model = infection_model or os.getenv("INFECTION_MODEL")
-    analysis_model = analysis_model or os.getenv("ANALYSIS_MODEL")
-    guard_model = guard_model or os.getenv("GUARD_MODEL", "meta-llama/Prompt-Guard-86M")
-    config_path = config_path or os.getenv("HIPOCAP_CONFIG_PATH", "hipocap_config.json")
-    hf_token = hf_token or os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACE_TOKEN")
+    settings = PipelineSettings.from_env()
+    openai_api_key = openai_api_key or settings.openai_api_key
+    openai_base_url = openai_base_url or settings.openai_base_url
+    openai_model = openai_model or settings.openai_model
+    infection_model = infection_model or settings.infection_model
+    analysis_model = analysis_model or settings.analysis_model
+    guard_model = guard_model or settings.guard_model
+    config_path = config_path or settings.config_path
+    hf_token = hf_token or settings.hf_token
     
     _pipeline = create_guard_pipeline(
         openai_api_key=openai_api_key,
@@ -88,20 +194,154 @@ def initialize_pipeline(
         verbose=False,  # Disable verbose logging in API mode
         **kwargs
     )
+    return _pipeline
+
+
+def _resolve_policy(db: Session, policy_key: Optional[str], owner_id: str) -> PolicySnapshot:
+    """
+    Load the policy an analyze request runs under, creating the default policy if needed.
+    
+    Blocking (sync SQLAlchemy); call it through asyncio.to_thread from async routes.
+    
+    Args:
+        db: Database session
+        policy_key: Requested policy key, or None for the owner's default policy
+        owner_id: LMNR user ID of the caller
+        
+    Returns:
+        Snapshot of the policy to apply, with its config dict already built
+        
+    Raises:
+        HTTPException: 404 if a requested policy_key does not exist
+    """
+    if policy_key:
+        # Load specific policy for this owner
+        policy = PolicyRepository.get_by_key(db, policy_key, owner_id=owner_id)
+        
+        # If 'default' policy is requested but missing, create it automatically
+        if not policy and policy_key == "default":
+            policy = PolicyRepository.get_or_create_default(db, owner_id)
+        
+        if not policy:
+            # Check if a policy with this key exists regardless of owner (e.g., system policies)
+            policy = PolicyRepository.get_by_key(db, policy_key)
+            
+        if not policy:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Policy '{policy_key}' not found"
+            )
+        return PolicyRepository.snapshot(policy)
+    
+    # Load default policy for this owner
+    policy = PolicyRepository.get_default(db, owner_id=owner_id)
+    
+    # If owner has no default, look for global default
+    if not policy:
+        policy = PolicyRepository.get_default(db)
+    
+    # If STILL no default exists (even global), create one for this owner
+    if not policy:
+        policy = PolicyRepository.get_or_create_default(db, owner_id)
+    return PolicyRepository.snapshot(policy)
+
+
+def _load_policy(policy_key: Optional[str], owner_id: str) -> PolicySnapshot:
+    """
+    Resolve an analyze request's policy in a short-lived database session.
+    
+    The session (and its pooled connection) is released before the analysis
+    runs, instead of being held by a request-scoped session until the
+    response is done.
+    
+    Args:
+        policy_key: Requested policy key, or None for the owner's default policy
+        owner_id: LMNR user ID of the caller
+        
+    Returns:
+        Snapshot of the policy to apply
+    """
+    db = SessionLocal()
+    try:
+        return _resolve_policy(db, policy_key, owner_id)
+    finally:
+        db.close()
 
 
 # Create router
-router = APIRouter(prefix="/api/v1", tags=["analysis"])
+router = APIRouter(prefix="/api/v1", tags=["analysis"], default_response_class=FastJSONResponse)
+
+
+def start_trace_writer() -> TraceWriter:
+    """
+    Start the batched trace writer used by /analyze.
+    
+    Returns:
+        Running TraceWriter instance
+    """
+    global _trace_writer
+    if _trace_writer is None:
+        _trace_writer = TraceWriter(
+            max_batch_size=TRACE_BATCH_SIZE,
+            max_wait_ms=TRACE_BATCH_WAIT_MS,
+            max_queue_size=TRACE_QUEUE_SIZE
+        )
+    return _trace_writer
+
+
+def stop_trace_writer() -> None:
+    """Write any queued traces and stop the batched trace writer."""
+    global _trace_writer
+    if _trace_writer is not None:
+        _trace_writer.close()
+        _trace_writer = None
+
+
+def _save_trace(
+    user_id: str,
+    api_key_id: Optional[str],
+    request_data: Dict[str, Any],
+    response_data: Dict[str, Any],
+    ip_address: Optional[str],
+    user_agent: Optional[str],
+    policy_key: Optional[str]
+) -> None:
+    """
+    Save an analysis trace in its own database session.
+    
+    Runs as a background task once the response has been sent, after the
+    request's session is closed. Failures are logged and never reach the client.
+    """
+    db = SessionLocal()
+    try:
+        AnalysisTraceRepository.create_trace(
+            db=db,
+            user_id=user_id,
+            api_key_id=api_key_id,
+            request_data=request_data,
+            response_data=response_data,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            policy_key=policy_key
+        )
+    except Exception:
+        logger.exception(
+            "Failed to save analysis trace (policy key: %s, user ID: %s, API key: %s)",
+            policy_key, user_id, api_key_id
+        )
+    finally:
+        db.close()
 
 
-@router.post("/analyze", response_model=AnalyzeResponse)
+@router.post("/analyze", responses={200: {"model": AnalyzeResponse}})
 async def analyze(
     request: AnalyzeRequest,
     http_request: Request,
+    background: BackgroundTasks,
     pipeline: GuardPipeline = Depends(get_pipeline),
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     policy_key: Optional[str] = Query(None, description="Policy key to use (defaults to user's default policy)")
-) -> AnalyzeResponse:
+) -> JSONResponse:
     """
     Analyze a function call for security threats.
     
@@ -109,292 +349,179 @@ async def analyze(
     
     Args:
         request: Analysis request with function details
+        background: Background tasks, used to save the trace after responding
         pipeline: GuardPipeline instance (injected dependency)
         api_key: API key from authentication
         policy_key: Optional policy key to use (if not provided, uses default policy)
         
     Returns:
-        Analysis response with decision and details
+        Analysis response with decision and details, in the AnalyzeResponse shape
     """
     try:
         # Load policy from database if specified or use default
-        from ..database.connection import get_db
-        from ..database.repositories.policy_repository import PolicyRepository
+        # Policies rarely change; only go to the database when the cached snapshot is missing or expired
+        policy_cache_key = (user_info.id, policy_key)
+        policy = POLICY_CACHE.get(policy_cache_key)
+        if policy is None:
+            # Sync SQLAlchemy: run the policy queries off the event loop
+            policy = await asyncio.to_thread(_load_policy, policy_key, user_info.id)
+            POLICY_CACHE.put(policy_cache_key, policy)
         
-        db_gen = get_db()
-        db = next(db_gen)
-        try:
-            policy = None
-            
-            if policy_key:
-                # Load specific policy for this owner
-                policy = PolicyRepository.get_by_key(db, policy_key, owner_id=user_info.id)
-                
-                # If 'default' policy is requested but missing, create it automatically
-                if not policy and policy_key == "default":
-                    policy = PolicyRepository.create(
-                        db=db,
-                        policy_key="default",
-                        name="Default Policy",
-                        owner_id=user_info.id,
-                        description="Automatically created default policy with standard security settings.",
-                        is_default=True
-                    )
-                
-                if not policy:
-                    # Check if a policy with this key exists regardless of owner (e.g., system policies)
-                    policy = PolicyRepository.get_by_key(db, policy_key)
-                    
-                if not policy:
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Policy '{policy_key}' not found"
-                    )
-            else:
-                # Load default policy for this owner
-                policy = PolicyRepository.get_default(db, owner_id=user_info.id)
-                
-                # If owner has no default, look for global default
-                if not policy:
-                    policy = PolicyRepository.get_default(db)
-                
-                # If STILL no default exists (even global), create one for this owner
-                if not policy:
-                    policy = PolicyRepository.create(
-                        db=db,
-                        policy_key="default",
-                        name="Default Policy",
-                        owner_id=user_info.id,
-                        description="Automatically created default policy with standard security settings.",
-                        is_default=True
-                    )
-            
-            # Debug log to verify policy used
-            if policy:
-                print(f"DEBUG: Using policy: {policy.policy_key} (owner: {policy.owner_id})")
-            
-            # Check permissions if policy exists
-            if policy:
-                if not policy.is_active:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Policy is not active"
-                    )
-                
-                # Check if user is owner or if it's a global policy
-                is_owner = policy.owner_id == user_info.id
-                
-                # We allow users to use any active policy for analysis,
-                # but if we wanted to enforce strictly private policies, we would check is_owner here.
-                # For now, let's just ensure they are active (checked above).
-                # To be safe, if a specific policy_key was requested, we allow it.
-                # Load policy config into pipeline
-                policy_config = PolicyRepository.to_config_dict(policy)
-                
-                # Set custom prompts from policy
-                original_custom_prompts = pipeline.custom_prompts
-                if policy.custom_prompts:
-                    pipeline.custom_prompts = policy.custom_prompts
-                
-                if policy_config:
-                    # Create or update pipeline config
-                    original_config = None
-                    config_was_none = False
-                    
-                    if pipeline.config is None:
-                        # Create a new Config object from policy config
-                        from ..config import Config
-                        pipeline.config = Config(config_dict=policy_config)
-                        config_was_none = True
-                    else:
-                        # Temporarily update existing pipeline config
-                        original_config = pipeline.config.config.copy()
-                        # Deep merge to preserve existing structure
-                        for key, value in policy_config.items():
-                            if key in original_config and isinstance(original_config[key], dict) and isinstance(value, dict):
-                                # Special handling for functions to merge nested function configs
-                                if key == "functions":
-                                    for func_name, func_config in value.items():
-                                        if func_name in original_config[key] and isinstance(original_config[key][func_name], dict):
-                                            # Merge function configs (e.g., preserve allowed_roles, add quarantine_exclude)
-                                            original_config[key][func_name].update(func_config)
-                                        else:
-                                            original_config[key][func_name] = func_config
-                                else:
-                                    original_config[key].update(value)
-                            else:
-                                original_config[key] = value
-                        
-                        pipeline.config.config = original_config
-                    
-                    try:
-                        result = pipeline.analyze(
-                            function_name=request.function_name,
-                            function_result=request.function_result,
-                            function_args=request.function_args,
-                            user_query=request.user_query,
-                            user_role=request.user_role,
-                            target_function=request.target_function,
-                            input_analysis=request.input_analysis,
-                            llm_analysis=request.llm_analysis,
-                            quarantine_analysis=request.quarantine_analysis,
-                            quick_analysis=request.quick_analysis,
-                            enable_keyword_detection=request.enable_keyword_detection,
-                            keywords=request.keywords
-                        )
-                    finally:
-                        # Restore original config if it existed
-                        if config_was_none:
-                            pipeline.config = None
-                        elif original_config is not None:
-                            pipeline.config.config = original_config.copy()
-                        # Restore original custom prompts
-                        pipeline.custom_prompts = original_custom_prompts
-                    
-                    # Format response
-                    response = _format_analyze_response(result)
-                    
-                    # Save trace to database
-                    # Initialize trace_policy_key before try block
-                    trace_policy_key = policy_key if policy_key else (policy.policy_key if policy else None)
-                    
-                    try:
-                        # Get client IP and user agent
-                        client_ip = http_request.client.host if http_request.client else None
-                        user_agent = http_request.headers.get("user-agent")
-                        
-                        request_data = {
-                            "function_name": request.function_name,
-                            "user_query": request.user_query,
-                            "user_role": request.user_role,
-                            "target_function": request.target_function,
-                            "input_analysis": request.input_analysis,
-                            "llm_analysis": request.llm_analysis,
-                            "quarantine_analysis": request.quarantine_analysis,
-                            "quick_analysis": request.quick_analysis,
-                            "enable_keyword_detection": request.enable_keyword_detection
-                        }
-                        response_dict = response.model_dump(mode='json')
-                        
-                        AnalysisTraceRepository.create_trace(
-                            db=db,
-                            user_id=user_info.id,
-                            api_key_id=user_info.api_key,
-                            request_data=request_data,
-                            response_data=response_dict,
-                            ip_address=client_ip,
-                            user_agent=user_agent,
-                            policy_key=trace_policy_key
-                        )
-                    except Exception as e:
-                        # Don't fail the request if trace saving fails, but log the error with details
-                        import logging
-                        import traceback
-                        logging.error(f"Failed to save analysis trace: {str(e)}")
-                        logging.error(f"Traceback: {traceback.format_exc()}")
-                        logging.error(f"Policy key: {trace_policy_key}, User ID: {user_info.id}, API Key: {user_info.api_key}")
-                    
-                    return response
-            
-            # Use default pipeline config if no policy found
-            result = pipeline.analyze(
-                function_name=request.function_name,
-                function_result=request.function_result,
-                user_query=request.user_query,
-                user_role=request.user_role,
-                target_function=request.target_function,
-                input_analysis=request.input_analysis,
-                llm_analysis=request.llm_analysis,
-                quarantine_analysis=request.quarantine_analysis,
-                enable_keyword_detection=request.enable_keyword_detection,
-                keywords=request.keywords
+        # Debug log to verify policy used
+        if policy and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Using policy: %s (owner: %s)", policy.policy_key, policy.owner_id)
+        
+        # Check permissions if policy exists
+        if policy and not policy.is_active:
+            raise HTTPException(
+                status_code=403,
+                detail="Policy is not active"
             )
-            
-            # Format response
-            response = _format_analyze_response(result)
-            
-            # Save trace to database
-            # Initialize trace_policy_key before try block
-            trace_policy_key = policy_key if policy_key else None
-            
-            try:
-                # Get client IP and user agent
-                client_ip = http_request.client.host if http_request.client else None
-                user_agent = http_request.headers.get("user-agent")
-                
-                request_data = {
-                    "function_name": request.function_name,
-                    "user_query": request.user_query,
-                    "user_role": request.user_role,
-                    "target_function": request.target_function,
-                    "input_analysis": request.input_analysis,
-                    "llm_analysis": request.llm_analysis,
-                    "quarantine_analysis": request.quarantine_analysis,
-                    "quick_analysis": request.quick_analysis,
-                    "enable_keyword_detection": request.enable_keyword_detection
-                }
-                response_dict = response.model_dump(mode='json')
-                
-                AnalysisTraceRepository.create_trace(
-                    db=db,
-                    user_id=user_info.id,
-                    api_key_id=user_info.api_key,
-                    request_data=request_data,
-                    response_data=response_dict,
-                    ip_address=client_ip,
-                    user_agent=user_agent,
-                    policy_key=trace_policy_key
-                )
-            except Exception as e:
-                # Don't fail the request if trace saving fails, but log the error with details
-                import logging
-                import traceback
-                logging.error(f"Failed to save analysis trace: {str(e)}")
-                logging.error(f"Traceback: {traceback.format_exc()}")
-                logging.error(f"Policy key: {trace_policy_key}, User ID: {user_info.id}, API Key: {user_info.api_key}")
-            
-            return response
-        finally:
-            db.close()
-    except Exception as e:
-        print(str(e))
+        
+        # We allow users to use any active policy for analysis,
+        # but if we wanted to enforce strictly private policies, we would check
+        # policy.owner_id == user_info.id here.
+        if policy and policy.config:
+            # Per-request view: shares the model, never mutates the shared pipeline
+            request_pipeline = pipeline.with_policy(policy.config, policy.custom_prompts)
+            trace_policy_key = policy_key or policy.policy_key
+        else:
+            # Use default pipeline config if no policy found
+            request_pipeline = pipeline
+            trace_policy_key = policy_key
+        
+        # Model and LLM calls block, so run them off the event loop
+        result = await run_analysis(
+            request_pipeline,
+            function_name=request.function_name,
+            function_result=request.function_result,
+            function_args=request.function_args,
+            user_query=request.user_query,
+            user_role=request.user_role,
+            target_function=request.target_function,
+            input_analysis=request.input_analysis,
+            llm_analysis=request.llm_analysis,
+            quarantine_analysis=request.quarantine_analysis,
+            quick_analysis=request.quick_analysis,
+            enable_keyword_detection=request.enable_keyword_detection,
+            keywords=request.keywords
+        )
+        
+        # Format response
+        response = _format_analyze_response(result)
+        
+        # Save trace to database
+        # Get client IP and user agent
+        client_ip = http_request.client.host if http_request.client else None
+        user_agent = http_request.headers.get("user-agent")
+        
+        request_data = request.model_dump(include=TRACE_REQUEST_FIELDS)
+        # One JSON-mode pass serves both the trace row and the HTTP body
+        response_dict = response.__pydantic_serializer__.to_python(response, mode="json")
+        
+        # Audit data only: queue for the next batch, or insert after the response is sent
+        trace_kwargs = dict(
+            user_id=user_info.id,
+            api_key_id=user_info.api_key,
+            request_data=request_data,
+            response_data=response_dict,
+            ip_address=client_ip,
+            user_agent=user_agent,
+            policy_key=trace_policy_key
+        )
+        if _trace_writer is None or not _trace_writer.submit(trace_kwargs):
+            background.add_task(_save_trace, **trace_kwargs)
+        
+        # Already serialized above; returned as-is without another validation pass
+        return FastJSONResponse(content=response_dict)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Analysis failed")
         raise HTTPException(
             status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+            detail="Analysis failed"
         )
 
 
+def _trace_list_response(traces: List[Any], total: int, limit: int, offset: int) -> JSONResponse:
+    """
+    Serialize a page of trace rows in the TraceListResponse shape.
+    
+    Rows are built with from_orm_trusted and dumped with the shared list adapter,
+    skipping the per-request TraceListResponse validation, and encoded with orjson.
+    """
+    rows = [AnalysisTraceResponse.from_orm_trusted(trace) for trace in traces]
+    return FastJSONResponse(content={
+        "traces": TRACE_LIST_ADAPTER.dump_python(rows, mode="json"),
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    })
+
+
 def _format_analyze_response(result: Dict[str, Any]) -> AnalyzeResponse:
-    """Format analysis result into response model."""
-    return AnalyzeResponse(
-        final_decision=result.get("final_decision", "ALLOWED"),
-        final_score=result.get("final_score"),
-        safe_to_use=result.get("safe_to_use", True),
-        blocked_at=result.get("blocked_at"),
-        reason=result.get("reason"),
-        input_analysis=result.get("input_analysis"),
-        quarantine_analysis=result.get("quarantine_analysis"),
-        llm_analysis=result.get("llm_analysis"),
-        keyword_detection=result.get("keyword_detection"),
-        rbac_blocked=result.get("rbac_blocked"),
-        chaining_blocked=result.get("chaining_blocked"),
-        severity_rule=result.get("severity_rule"),
-        output_restriction=result.get("output_restriction"),
-        context_rule=result.get("context_rule"),
-        warning=result.get("warning"),
-        function_chaining_info=result.get("function_chaining_info")
-    )
+    """
+    Format analysis result into response model.
+    
+    The result comes from GuardPipeline.analyze, not from the client, so the
+    model is built with model_construct instead of being validated again.
+    """
+    data = {"final_decision": "ALLOWED", "safe_to_use": True}
+    data.update({key: result[key] for key in result.keys() & ANALYZE_RESPONSE_FIELDS})
+    return AnalyzeResponse.model_construct(**data)
+
+
+def _cached_stats_response(
+    http_request: Request,
+    cache_key: Hashable,
+    build: Callable[[], Dict[str, Any]]
+) -> Response:
+    """
+    Serve a stats payload from the per-user cache, building it on a miss.
+    
+    Args:
+        http_request: Incoming request, checked for If-None-Match
+        cache_key: Key identifying the endpoint, user and query parameters
+        build: Computes the payload when the cache has no fresh entry
+        
+    Returns:
+        JSON response with ETag and Cache-Control headers, or an empty 304
+        when the client's If-None-Match matches
+    """
+    now = time.monotonic()
+    entry = _trace_stats_cache.get(cache_key)
+    if entry is None or entry[0] <= now:
+        body = FastJSONResponse(content=build()).body
+        entry = (now + TRACE_STATS_CACHE_TTL, body, f'"{hashlib.sha1(body).hexdigest()}"')
+        if TRACE_STATS_CACHE_TTL > 0:
+            if len(_trace_stats_cache) >= TRACE_STATS_CACHE_SIZE:
+                _trace_stats_cache.clear()
+            _trace_stats_cache[cache_key] = entry
+    
+    headers = {
+        "ETag": entry[2],
+        "Cache-Control": f"private, max-age={int(TRACE_STATS_CACHE_TTL)}"
+    }
+    if http_request.headers.get("if-none-match") == entry[2]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry[1], media_type="application/json", headers=headers)
 
 
 @router.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> Response:
     """Health check endpoint."""
-    return {"status": "healthy", "service": "hipocap-v1"}
+    return Response(
+        content=_HEALTH_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=10"}
+    )
 
 
 @router.get("/user-info")
 async def get_user_info(
     request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
     """
@@ -402,15 +529,11 @@ async def get_user_info(
     
     Returns user ID and email associated with the API key.
     """
-    from ..auth.lmnr_validator import get_lmnr_user_by_api_key
-    
     # Extract API key from Authorization header
     api_key = None
     if authorization:
-        if authorization.startswith("Bearer "):
-            api_key = authorization[7:]
-        else:
-            api_key = authorization
+        scheme, sep, token = authorization.partition(" ")
+        api_key = token if sep and scheme == "Bearer" else authorization
     
     # Also check X-API-Key header
     if not api_key:
@@ -423,8 +546,8 @@ async def get_user_info(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user info from API key
-    user_info = get_lmnr_user_by_api_key(api_key)
+    # Get user info from API key (blocking LMNR query unless cached)
+    user_info = await asyncio.to_thread(get_lmnr_user_by_api_key, api_key)
     if not user_info:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -432,6 +555,10 @@ async def get_user_info(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Per-key answer: only the caller may reuse it, for as long as the server caches it
+    response.headers["Cache-Control"] = f"private, max-age={int(USER_BY_KEY_CACHE_TTL)}"
+    response.headers["Vary"] = "Authorization, X-API-Key"
+    
     return {
         "user_id": user_info["id"],
         "email": user_info["email"],
@@ -467,6 +594,8 @@ async def update_rbac(
             roles=request.roles,
             functions=request.functions
         )
+        # Views merged from the old base config are stale now
+        pipeline.clear_policy_views()
         
         return RBACUpdateResponse(
             success=True,
@@ -484,14 +613,14 @@ async def update_rbac(
 # Analysis Trace and Review Management Endpoints
 
 @router.get("/traces/review-required", response_model=TraceListResponse)
-async def get_review_required_traces(
+def get_review_required_traces(
     status: Optional[str] = Query(None, description="Filter by review status (pending, approved, rejected, reviewed)"),
     function_name: Optional[str] = Query(None, description="Filter by function name"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> TraceListResponse:
+) -> JSONResponse:
     """
     Get all traces that require review for the current user.
     
@@ -514,12 +643,7 @@ async def get_review_required_traces(
             status=status
         )
         
-        return TraceListResponse(
-            traces=[AnalysisTraceResponse.model_validate(trace) for trace in traces],
-            total=total,
-            limit=limit,
-            offset=offset
-        )
+        return _trace_list_response(traces, total, limit, offset)
     except HTTPException:
         raise
     except Exception as e:
@@ -530,19 +654,20 @@ async def get_review_required_traces(
 
 
 @router.get("/traces/stats", response_model=TraceStatsResponse)
-async def get_trace_stats(
+def get_trace_stats(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> TraceStatsResponse:
+) -> Response:
     """
     Get statistics about traces grouped by final_decision.
     
     Returns counts of blocked, allowed, and review_required traces,
     along with statistics grouped by function name.
     """
-    try:
+    def build() -> Dict[str, Any]:
         # Get stats by decision
         stats_by_decision = AnalysisTraceRepository.get_stats_by_decision(
             db=db,
@@ -559,12 +684,17 @@ async def get_trace_stats(
             end_date=end_date
         )
         
-        return TraceStatsResponse(
-            total=stats_by_decision["total"],
-            blocked=stats_by_decision["blocked"],
-            allowed=stats_by_decision["allowed"],
-            review_required=stats_by_decision["review_required"],
-            by_function=stats_by_function
+        return {
+            "total": stats_by_decision["total"],
+            "blocked": stats_by_decision["blocked"],
+            "allowed": stats_by_decision["allowed"],
+            "review_required": stats_by_decision["review_required"],
+            "by_function": stats_by_function
+        }
+    
+    try:
+        return _cached_stats_response(
+            http_request, ("stats", user_info.id, start_date, end_date), build
         )
     except HTTPException:
         raise
@@ -578,13 +708,14 @@ async def get_trace_stats(
 # IMPORTANT: This route must be defined BEFORE /traces/{trace_id} to avoid route conflicts
 # FastAPI matches routes in order, so specific paths must come before parameterized paths
 @router.get("/traces/timeseries", response_model=TraceTimeSeriesResponse)
-async def get_trace_timeseries(
+def get_trace_timeseries(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     interval: str = Query("hour", description="Time interval: minute, hour, or day"),
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> TraceTimeSeriesResponse:
+) -> Response:
     """
     Get time-series statistics for blocked and allowed functions.
     
@@ -599,26 +730,21 @@ async def get_trace_timeseries(
                 detail=f"Invalid interval. Must be one of: {', '.join(valid_intervals)}"
             )
         
-        # Get time-series data
-        time_series_data = AnalysisTraceRepository.get_time_series_stats(
-            db=db,
-            user_id=user_info.id,
-            start_date=start_date,
-            end_date=end_date,
-            interval=interval
-        )
-        
-        # Convert to response model
-        items = [
-            TraceTimeSeriesDataPoint(
-                timestamp=item["timestamp"],
-                blocked=item["blocked"],
-                allowed=item["allowed"]
+        def build() -> Dict[str, Any]:
+            # Get time-series data
+            time_series_data = AnalysisTraceRepository.get_time_series_stats(
+                db=db,
+                user_id=user_info.id,
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval
             )
-            for item in time_series_data
-        ]
+            # The repository already returns primitive {timestamp, blocked, allowed} dicts
+            return {"items": time_series_data}
         
-        return TraceTimeSeriesResponse(items=items)
+        return _cached_stats_response(
+            http_request, ("timeseries", user_info.id, start_date, end_date, interval), build
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -629,7 +755,7 @@ async def get_trace_timeseries(
 
 
 @router.get("/traces/{trace_id}", response_model=AnalysisTraceResponse)
-async def get_trace(
+def get_trace(
     trace_id: int,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
@@ -651,7 +777,7 @@ async def get_trace(
                 detail="Not authorized to view this trace"
             )
         
-        return AnalysisTraceResponse.model_validate(trace)
+        return AnalysisTraceResponse.from_orm_trusted(trace)
     except HTTPException:
         raise
     except Exception as e:
@@ -662,7 +788,7 @@ async def get_trace(
 
 
 @router.post("/traces/{trace_id}/review", response_model=ReviewUpdateResponse)
-async def update_review_status(
+def update_review_status(
     trace_id: int,
     review_update: ReviewUpdateRequest,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
@@ -708,7 +834,7 @@ async def update_review_status(
         return ReviewUpdateResponse(
             success=True,
             message=f"Review status updated to '{review_update.status}'",
-            trace=AnalysisTraceResponse.model_validate(updated_trace)
+            trace=AnalysisTraceResponse.from_orm_trusted(updated_trace)
         )
     except HTTPException:
         raise
@@ -720,7 +846,7 @@ async def update_review_status(
 
 
 @router.get("/traces", response_model=TraceListResponse)
-async def list_traces(
+def list_traces(
     function_name: Optional[str] = Query(None, description="Filter by function name"),
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
@@ -729,15 +855,15 @@ async def list_traces(
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> TraceListResponse:
+) -> JSONResponse:
     """
     List all traces for the current user (for compliance queries).
     
     Returns paginated list sorted by created_at DESC.
     """
     try:
-        # Get traces for compliance
-        traces = AnalysisTraceRepository.get_for_compliance(
+        # Get traces for compliance, with the total from the same query
+        traces, total = AnalysisTraceRepository.get_for_compliance(
             db=db,
             user_id=user_info.id,
             start_date=start_date,
@@ -748,15 +874,7 @@ async def list_traces(
             offset=offset
         )
         
-        # Get total count
-        total = AnalysisTraceRepository.count_by_user(db, user_info.id)
-        
-        return TraceListResponse(
-            traces=[AnalysisTraceResponse.model_validate(trace) for trace in traces],
-            total=total,
-            limit=limit,
-            offset=offset
-        )
+        return _trace_list_response(traces, total, limit, offset)
     except HTTPException:
         raise
     except Exception as e:
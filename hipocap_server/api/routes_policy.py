@@ -2,25 +2,90 @@
 Governance policy management routes.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from .models import PolicyCreate, PolicyUpdate, PolicyResponse, PolicyUpdateResponse
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import logging
+import os
+import time
+from .models import (
+    PolicyCreate, PolicyUpdate, PolicyResponse, PolicyUpdateResponse, POLICY_LIST_ADAPTER,
+    validate_policy_structure
+)
 from ..database.connection import get_db
+from ..database.models import GovernancePolicy
 from ..database.repositories.policy_repository import PolicyRepository
-from ..database.init_db import create_default_policy
 from ..auth.middleware import get_lmnr_user_info, LMNRUserInfo
+from .routes import FastJSONResponse
 
-router = APIRouter(prefix="/api/v1/policies", tags=["policies"])
+logger = logging.getLogger(__name__)
+
+# GET /default/active is public and read-mostly; its encoded body is reused for a
+# few seconds and dropped when a policy write here changes which policy is default
+DEFAULT_POLICY_CACHE_TTL = float(os.getenv("DEFAULT_POLICY_CACHE_TTL", "2"))
+_default_policy_cache: Optional[Tuple[float, bytes]] = None
+
+# GET /policies responses per owner, encoded; dropped on any write to that owner's policies
+POLICY_LIST_CACHE_TTL = float(os.getenv("POLICY_LIST_CACHE_TTL", "2"))
+POLICY_LIST_CACHE_SIZE = int(os.getenv("POLICY_LIST_CACHE_SIZE", "1024"))
+_policy_list_cache: Dict[str, Tuple[float, bytes]] = {}
+
+router = APIRouter(prefix="/api/v1/policies", tags=["policies"], default_response_class=FastJSONResponse)
+
+
+def _invalidate_default_policy() -> None:
+    """Drop the cached GET /default/active response."""
+    global _default_policy_cache
+    _default_policy_cache = None
+
+
+def _invalidate_policy_list(owner_id: str) -> None:
+    """Drop the cached GET /policies response for an owner."""
+    _policy_list_cache.pop(owner_id, None)
+
+
+def _model_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Encode a response model built from trusted data in one pydantic-core pass.
+    
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder walk; response_model stays on the routes for the OpenAPI schema.
+    
+    Args:
+        model: Response model instance (typically built with model_construct)
+        status_code: HTTP status code of the response
+        
+    Returns:
+        JSON response with the encoded model
+    """
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        media_type="application/json",
+        status_code=status_code
+    )
+
+
+def _check_policy_structure(policy_data: Union[PolicyCreate, PolicyUpdate]) -> None:
+    """Reject policy sections with the wrong JSON shape as 422, like body validation errors."""
+    try:
+        validate_policy_structure(policy_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
 
 
 @router.post("", response_model=PolicyResponse, status_code=status.HTTP_201_CREATED)
-async def create_policy(
+def create_policy(
     policy_data: PolicyCreate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Create a new governance policy."""
+    _check_policy_structure(policy_data)
+    
     # Check if policy_key already exists for this user
     existing = PolicyRepository.get_by_key(db, policy_data.policy_key, owner_id=user_info.id)
     if existing:
@@ -50,35 +115,26 @@ async def create_policy(
         custom_prompts=policy_data.custom_prompts,
         is_default=policy_data.is_default
     )
+    _invalidate_policy_list(user_info.id)
+    if policy.is_default:
+        _invalidate_default_policy()
     
-    return PolicyResponse(
-        id=policy.id,
-        policy_key=policy.policy_key,
-        name=policy.name,
-        description=policy.description,
-        owner_id=policy.owner_id,
-        roles=policy.roles,
-        functions=policy.functions,
-        severity_rules=policy.severity_rules,
-        output_restrictions=policy.output_restrictions,
-        function_chaining=policy.function_chaining,
-        context_rules=policy.context_rules,
-        decision_thresholds=policy.decision_thresholds,
-        custom_prompts=policy.custom_prompts,
-        is_active=policy.is_active,
-        is_default=policy.is_default,
-        created_at=policy.created_at.isoformat() if policy.created_at else "",
-        updated_at=policy.updated_at.isoformat() if policy.updated_at else None
-    )
+    return _model_response(PolicyResponse.from_orm_trusted(policy), status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=List[PolicyResponse])
-async def list_policies(
+def list_policies(
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db),
     owner_only: bool = False
-) -> List[PolicyResponse]:
+) -> Response:
     """List all policies (or only current user's policies if owner_only=True)."""
+    # Both listings are the owner's policies, so they share one cache entry
+    now = time.monotonic()
+    cached = _policy_list_cache.get(user_info.id)
+    if cached is not None and cached[0] > now:
+        return Response(content=cached[1], media_type="application/json")
+    
     if owner_only:
         policies = PolicyRepository.get_by_owner(db, user_info.id)
     else:
@@ -86,52 +142,34 @@ async def list_policies(
         # Admin check can be added later if needed via LMNR user roles
         policies = PolicyRepository.get_by_owner(db, user_info.id)
     
-    # Auto-create default policy if user has no policies and no default policy exists
+    # Auto-create default policy if user has no policies (so no default policy either)
     if not policies:
-        # Check if default policy exists for this user
-        existing_default = PolicyRepository.get_by_key(db, "default", owner_id=user_info.id)
-        if not existing_default:
-            # Create default policy for this user
-            try:
-                create_default_policy(user_info.id)
-                # Refresh policies list
-                policies = PolicyRepository.get_by_owner(db, user_info.id)
-            except Exception as e:
-                # Log error but don't fail the request
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Failed to auto-create default policy: {e}")
-    
-    return [
-        PolicyResponse(
-            id=policy.id,
-            policy_key=policy.policy_key,
-            name=policy.name,
-            description=policy.description,
-            owner_id=policy.owner_id,
-            roles=policy.roles,
-            functions=policy.functions,
-            severity_rules=policy.severity_rules,
-            output_restrictions=policy.output_restrictions,
-            function_chaining=policy.function_chaining,
-            context_rules=policy.context_rules,
-            decision_thresholds=policy.decision_thresholds,
-            custom_prompts=policy.custom_prompts,
-            is_active=policy.is_active,
-            is_default=policy.is_default,
-            created_at=policy.created_at.isoformat() if policy.created_at else "",
-            updated_at=policy.updated_at.isoformat() if policy.updated_at else None
-        )
-        for policy in policies
-    ]
+        # One upsert that returns the policy, instead of re-checking and re-listing
+        try:
+            policies = [PolicyRepository.get_or_create_default(
+                db, user_info.id, config=PolicyRepository.build_default_config()
+            )]
+        except Exception as e:
+            # Log error but don't fail the request
+            db.rollback()
+            logger.warning("Failed to auto-create default policy: %s", e)
+    
+    body = POLICY_LIST_ADAPTER.dump_json(
+        [PolicyResponse.from_orm_trusted(policy) for policy in policies]
+    )
+    if POLICY_LIST_CACHE_TTL > 0 and policies:
+        if len(_policy_list_cache) >= POLICY_LIST_CACHE_SIZE:
+            _policy_list_cache.clear()
+        _policy_list_cache[user_info.id] = (now + POLICY_LIST_CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{policy_key}", response_model=PolicyResponse)
-async def get_policy(
+def get_policy(
     policy_key: str,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Get a specific policy by key."""
     policy = PolicyRepository.get_by_key(db, policy_key, owner_id=user_info.id)
     if not policy:
@@ -147,34 +185,16 @@ async def get_policy(
             detail="Not authorized to access this policy"
         )
     
-    return PolicyResponse(
-        id=policy.id,
-        policy_key=policy.policy_key,
-        name=policy.name,
-        description=policy.description,
-        owner_id=policy.owner_id,
-        roles=policy.roles,
-        functions=policy.functions,
-        severity_rules=policy.severity_rules,
-        output_restrictions=policy.output_restrictions,
-        function_chaining=policy.function_chaining,
-        context_rules=policy.context_rules,
-        decision_thresholds=policy.decision_thresholds,
-        custom_prompts=policy.custom_prompts,
-        is_active=policy.is_active,
-        is_default=policy.is_default,
-        created_at=policy.created_at.isoformat() if policy.created_at else "",
-        updated_at=policy.updated_at.isoformat() if policy.updated_at else None
-    )
+    return _model_response(PolicyResponse.from_orm_trusted(policy))
 
 
 @router.put("/{policy_id}", response_model=PolicyUpdateResponse)
-async def update_policy(
+def update_policy(
     policy_id: int,
     policy_data: PolicyUpdate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyUpdateResponse:
+) -> Response:
     """
     Update a policy with detailed change tracking.
     
@@ -198,23 +218,10 @@ async def update_policy(
             detail="Not authorized to update this policy. Only the owner can update policies."
         )
     
-    # Validate that at least one field is being updated
-    update_fields = {
-        "name": policy_data.name,
-        "description": policy_data.description,
-        "roles": policy_data.roles,
-        "functions": policy_data.functions,
-        "severity_rules": policy_data.severity_rules,
-        "output_restrictions": policy_data.output_restrictions,
-        "function_chaining": policy_data.function_chaining,
-        "context_rules": policy_data.context_rules,
-        "decision_thresholds": policy_data.decision_thresholds,
-        "custom_prompts": policy_data.custom_prompts,
-        "is_active": policy_data.is_active,
-        "is_default": policy_data.is_default
-    }
-    
-    if all(v is None for v in update_fields.values()):
+    _check_policy_structure(policy_data)
+    
+    # Validate that at least one field is being updated (fields the client left out are None)
+    if all(getattr(policy_data, name) is None for name in policy_data.model_fields_set):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields provided for update. At least one field must be specified."
@@ -251,41 +258,27 @@ async def update_policy(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update policy"
         )
+    _invalidate_policy_list(user_info.id)
+    if policy_data.is_default is not None or updated_policy.is_default:
+        _invalidate_default_policy()
     
-    policy_response = PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
-    )
+    policy_response = PolicyResponse.from_orm_trusted(updated_policy)
     
-    return PolicyUpdateResponse(
+    return _model_response(PolicyUpdateResponse.model_construct(
         success=True,
         policy=policy_response,
         changes=changes,
         warnings=warnings if warnings else None
-    )
+    ))
 
 
 @router.patch("/{policy_key}", response_model=PolicyUpdateResponse)
-async def patch_policy_by_key(
+def patch_policy_by_key(
     policy_key: str,
     policy_data: PolicyUpdate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyUpdateResponse:
+) -> Response:
     """
     Partially update a policy by policy_key with detailed change tracking.
     
@@ -306,23 +299,10 @@ async def patch_policy_by_key(
             detail="Not authorized to update this policy. Only the owner can update policies."
         )
     
-    # Validate that at least one field is being updated
-    update_fields = {
-        "name": policy_data.name,
-        "description": policy_data.description,
-        "roles": policy_data.roles,
-        "functions": policy_data.functions,
-        "severity_rules": policy_data.severity_rules,
-        "output_restrictions": policy_data.output_restrictions,
-        "function_chaining": policy_data.function_chaining,
-        "context_rules": policy_data.context_rules,
-        "decision_thresholds": policy_data.decision_thresholds,
-        "custom_prompts": policy_data.custom_prompts,
-        "is_active": policy_data.is_active,
-        "is_default": policy_data.is_default
-    }
-    
-    if all(v is None for v in update_fields.values()):
+    _check_policy_structure(policy_data)
+    
+    # Validate that at least one field is being updated (fields the client left out are None)
+    if all(getattr(policy_data, name) is None for name in policy_data.model_fields_set):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields provided for update. At least one field must be specified."
@@ -359,36 +339,22 @@ async def patch_policy_by_key(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update policy"
         )
+    _invalidate_policy_list(user_info.id)
+    if policy_data.is_default is not None or updated_policy.is_default:
+        _invalidate_default_policy()
     
-    policy_response = PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
-    )
+    policy_response = PolicyResponse.from_orm_trusted(updated_policy)
     
-    return PolicyUpdateResponse(
+    return _model_response(PolicyUpdateResponse.model_construct(
         success=True,
         policy=policy_response,
         changes=changes,
         warnings=warnings if warnings else None
-    )
+    ))
 
 
 @router.delete("/{policy_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_policy(
+def delete_policy(
     policy_id: int,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
@@ -408,14 +374,23 @@ async def delete_policy(
             detail="Not authorized to delete this policy"
         )
     
+    was_default = policy.is_default
     PolicyRepository.delete(db, policy_id)
+    _invalidate_policy_list(user_info.id)
+    if was_default:
+        _invalidate_default_policy()
 
 
 @router.get("/default/active", response_model=PolicyResponse)
-async def get_default_policy(
+def get_default_policy(
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Get the default active policy (public endpoint, no auth required for reading)."""
+    global _default_policy_cache
+    cached = _default_policy_cache
+    if cached is not None and cached[0] > time.monotonic():
+        return Response(content=cached[1], media_type="application/json")
+    
     policy = PolicyRepository.get_default(db)
     if not policy:
         raise HTTPException(
@@ -423,35 +398,37 @@ async def get_default_policy(
             detail="No default policy found"
         )
     
-    return PolicyResponse(
-        id=policy.id,
-        policy_key=policy.policy_key,
-        name=policy.name,
-        description=policy.description,
-        owner_id=policy.owner_id,
-        roles=policy.roles,
-        functions=policy.functions,
-        severity_rules=policy.severity_rules,
-        output_restrictions=policy.output_restrictions,
-        function_chaining=policy.function_chaining,
-        context_rules=policy.context_rules,
-        decision_thresholds=policy.decision_thresholds,
-        custom_prompts=policy.custom_prompts,
-        is_active=policy.is_active,
-        is_default=policy.is_default,
-        created_at=policy.created_at.isoformat() if policy.created_at else "",
-        updated_at=policy.updated_at.isoformat() if policy.updated_at else None
-    )
+    response = _model_response(PolicyResponse.from_orm_trusted(policy))
+    if DEFAULT_POLICY_CACHE_TTL > 0:
+        _default_policy_cache = (time.monotonic() + DEFAULT_POLICY_CACHE_TTL, response.body)
+    return response
 
 
-@router.delete("/{policy_id}/roles/{role_name}", response_model=PolicyResponse)
-async def delete_role(
+def _delete_policy_entry(
+    db: Session,
     policy_id: int,
-    role_name: str,
-    user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
-    db: Session = Depends(get_db)
-) -> PolicyResponse:
-    """Delete a role from a policy."""
+    owner_id: str,
+    delete: Callable[[Session, int, Any], Optional[GovernancePolicy]],
+    key: Any,
+    missing_detail: str
+) -> Response:
+    """
+    Shared body of the sub-resource DELETE routes.
+    
+    Args:
+        db: Database session
+        policy_id: Policy ID
+        owner_id: LMNR user ID of the caller, who must own the policy
+        delete: PolicyRepository method removing the entry
+        key: Entry to remove (name or index)
+        missing_detail: 404 detail when the entry does not exist
+        
+    Returns:
+        Updated policy response
+        
+    Raises:
+        HTTPException: 404 if the policy or entry does not exist, 403 if the caller is not the owner
+    """
     policy = PolicyRepository.get_by_id(db, policy_id)
     if not policy:
         raise HTTPException(
@@ -460,232 +437,92 @@ async def delete_role(
         )
     
     # Check permissions - only owner can delete
-    if policy.owner_id != user_info.id:
+    if policy.owner_id != owner_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to modify this policy"
         )
     
-    updated_policy = PolicyRepository.delete_role(db, policy_id, role_name)
+    updated_policy = delete(db, policy_id, key)
     if not updated_policy:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Role '{role_name}' not found in policy"
+            detail=missing_detail
         )
+    _invalidate_policy_list(owner_id)
+    if updated_policy.is_default:
+        _invalidate_default_policy()
     
-    return PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
+    return _model_response(PolicyResponse.from_orm_trusted(updated_policy))
+
+
+@router.delete("/{policy_id}/roles/{role_name}", response_model=PolicyResponse)
+def delete_role(
+    policy_id: int,
+    role_name: str,
+    user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Delete a role from a policy."""
+    return _delete_policy_entry(
+        db, policy_id, user_info.id, PolicyRepository.delete_role, role_name,
+        f"Role '{role_name}' not found in policy"
     )
 
 
 @router.delete("/{policy_id}/functions/{function_name}", response_model=PolicyResponse)
-async def delete_function(
+def delete_function(
     policy_id: int,
     function_name: str,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Delete a function from a policy."""
-    policy = PolicyRepository.get_by_id(db, policy_id)
-    if not policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Policy with ID {policy_id} not found"
-        )
-    
-    # Check permissions - only owner can delete
-    if policy.owner_id != user_info.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this policy"
-        )
-    
-    updated_policy = PolicyRepository.delete_function(db, policy_id, function_name)
-    if not updated_policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Function '{function_name}' not found in policy"
-        )
-    
-    return PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
+    return _delete_policy_entry(
+        db, policy_id, user_info.id, PolicyRepository.delete_function, function_name,
+        f"Function '{function_name}' not found in policy"
     )
 
 
 @router.delete("/{policy_id}/severity-rules/{severity_level}", response_model=PolicyResponse)
-async def delete_severity_rule(
+def delete_severity_rule(
     policy_id: int,
     severity_level: str,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Delete a severity rule from a policy."""
-    policy = PolicyRepository.get_by_id(db, policy_id)
-    if not policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Policy with ID {policy_id} not found"
-        )
-    
-    # Check permissions - only owner can delete
-    if policy.owner_id != user_info.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this policy"
-        )
-    
-    updated_policy = PolicyRepository.delete_severity_rule(db, policy_id, severity_level)
-    if not updated_policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Severity rule '{severity_level}' not found in policy"
-        )
-    
-    return PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
+    return _delete_policy_entry(
+        db, policy_id, user_info.id, PolicyRepository.delete_severity_rule, severity_level,
+        f"Severity rule '{severity_level}' not found in policy"
     )
 
 
 @router.delete("/{policy_id}/function-chaining/{source_function}", response_model=PolicyResponse)
-async def delete_function_chaining(
+def delete_function_chaining(
     policy_id: int,
     source_function: str,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Delete a function chaining rule from a policy."""
-    policy = PolicyRepository.get_by_id(db, policy_id)
-    if not policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Policy with ID {policy_id} not found"
-        )
-    
-    # Check permissions - only owner can delete
-    if policy.owner_id != user_info.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this policy"
-        )
-    
-    updated_policy = PolicyRepository.delete_function_chaining(db, policy_id, source_function)
-    if not updated_policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Function chaining rule for '{source_function}' not found in policy"
-        )
-    
-    return PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
+    return _delete_policy_entry(
+        db, policy_id, user_info.id, PolicyRepository.delete_function_chaining, source_function,
+        f"Function chaining rule for '{source_function}' not found in policy"
     )
 
 
 @router.delete("/{policy_id}/context-rules/{rule_index}", response_model=PolicyResponse)
-async def delete_context_rule(
+def delete_context_rule(
     policy_id: int,
     rule_index: int,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
-) -> PolicyResponse:
+) -> Response:
     """Delete a context rule from a policy by index."""
-    policy = PolicyRepository.get_by_id(db, policy_id)
-    if not policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Policy with ID {policy_id} not found"
-        )
-    
-    # Check permissions - only owner can delete
-    if policy.owner_id != user_info.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this policy"
-        )
-    
-    updated_policy = PolicyRepository.delete_context_rule(db, policy_id, rule_index)
-    if not updated_policy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Context rule at index {rule_index} not found in policy"
-        )
-    
-    return PolicyResponse(
-        id=updated_policy.id,
-        policy_key=updated_policy.policy_key,
-        name=updated_policy.name,
-        description=updated_policy.description,
-        owner_id=updated_policy.owner_id,
-        roles=updated_policy.roles,
-        functions=updated_policy.functions,
-        severity_rules=updated_policy.severity_rules,
-        output_restrictions=updated_policy.output_restrictions,
-        function_chaining=updated_policy.function_chaining,
-        context_rules=updated_policy.context_rules,
-        decision_thresholds=updated_policy.decision_thresholds,
-        is_active=updated_policy.is_active,
-        is_default=updated_policy.is_default,
-        created_at=updated_policy.created_at.isoformat() if updated_policy.created_at else "",
-        updated_at=updated_policy.updated_at.isoformat() if updated_policy.updated_at else None
+    return _delete_policy_entry(
+        db, policy_id, user_info.id, PolicyRepository.delete_context_rule, rule_index,
+        f"Context rule at index {rule_index} not found in policy"
     )
 
 
@@ -5,6 +5,7 @@ Shield management routes.
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 from .models import (
     ShieldCreate, ShieldUpdate, ShieldResponse, ShieldUpdateResponse,
     ShieldAnalyzeRequest, ShieldAnalyzeResponse
@@ -13,13 +14,13 @@ from ..database.connection import get_db
 from ..database.repositories.shield_repository import ShieldRepository
 from ..auth.middleware import get_lmnr_user_info, LMNRUserInfo
 from ..pipeline import GuardPipeline
-from .routes import get_pipeline
+from .routes import get_pipeline, run_analysis
 
 router = APIRouter(prefix="/api/v1/shields", tags=["shields"])
 
 
 @router.post("", response_model=ShieldResponse, status_code=status.HTTP_201_CREATED)
-async def create_shield(
+def create_shield(
     shield_data: ShieldCreate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
@@ -39,7 +40,7 @@ async def create_shield(
             shield_key=shield_data.shield_key,
             name=shield_data.name,
             owner_id=user_info.id,
-            content=shield_data.content,
+            content=shield_data.content.model_dump(),
             description=shield_data.description
         )
     except ValueError as e:
@@ -48,23 +49,11 @@ async def create_shield(
             detail=str(e)
         )
     
-    return ShieldResponse(
-        id=shield.id,
-        shield_key=shield.shield_key,
-        name=shield.name,
-        description=shield.description,
-        prompt_description=shield.prompt_description,
-        what_to_block=shield.what_to_block,
-        what_not_to_block=shield.what_not_to_block,
-        owner_id=shield.owner_id,
-        is_active=shield.is_active,
-        created_at=shield.created_at.isoformat() if shield.created_at else "",
-        updated_at=shield.updated_at.isoformat() if shield.updated_at else None
-    )
+    return ShieldResponse.from_orm_trusted(shield)
 
 
 @router.get("", response_model=List[ShieldResponse])
-async def list_shields(
+def list_shields(
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db),
     owner_only: bool = False
@@ -77,25 +66,13 @@ async def list_shields(
         shields = ShieldRepository.get_by_owner(db, user_info.id)
     
     return [
-        ShieldResponse(
-            id=shield.id,
-            shield_key=shield.shield_key,
-            name=shield.name,
-            description=shield.description,
-            prompt_description=shield.prompt_description,
-            what_to_block=shield.what_to_block,
-            what_not_to_block=shield.what_not_to_block,
-            owner_id=shield.owner_id,
-            is_active=shield.is_active,
-            created_at=shield.created_at.isoformat() if shield.created_at else "",
-            updated_at=shield.updated_at.isoformat() if shield.updated_at else None
-        )
+        ShieldResponse.from_orm_trusted(shield)
         for shield in shields
     ]
 
 
 @router.get("/{shield_key}", response_model=ShieldResponse)
-async def get_shield(
+def get_shield(
     shield_key: str,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
@@ -115,23 +92,11 @@ async def get_shield(
             detail="Not authorized to access this shield"
         )
     
-    return ShieldResponse(
-        id=shield.id,
-        shield_key=shield.shield_key,
-        name=shield.name,
-        description=shield.description,
-        prompt_description=shield.prompt_description,
-        what_to_block=shield.what_to_block,
-        what_not_to_block=shield.what_not_to_block,
-        owner_id=shield.owner_id,
-        is_active=shield.is_active,
-        created_at=shield.created_at.isoformat() if shield.created_at else "",
-        updated_at=shield.updated_at.isoformat() if shield.updated_at else None
-    )
+    return ShieldResponse.from_orm_trusted(shield)
 
 
 @router.put("/{shield_id}", response_model=ShieldUpdateResponse)
-async def update_shield(
+def update_shield(
     shield_id: int,
     shield_data: ShieldUpdate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
@@ -176,7 +141,7 @@ async def update_shield(
             shield_id=shield_id,
             name=shield_data.name,
             description=shield_data.description,
-            content=shield_data.content,
+            content=shield_data.content.model_dump() if shield_data.content else None,
             is_active=shield_data.is_active
         )
     except ValueError as e:
@@ -191,19 +156,7 @@ async def update_shield(
             detail="Failed to update shield"
         )
     
-    shield_response = ShieldResponse(
-        id=updated_shield.id,
-        shield_key=updated_shield.shield_key,
-        name=updated_shield.name,
-        description=updated_shield.description,
-        prompt_description=updated_shield.prompt_description,
-        what_to_block=updated_shield.what_to_block,
-        what_not_to_block=updated_shield.what_not_to_block,
-        owner_id=updated_shield.owner_id,
-        is_active=updated_shield.is_active,
-        created_at=updated_shield.created_at.isoformat() if updated_shield.created_at else "",
-        updated_at=updated_shield.updated_at.isoformat() if updated_shield.updated_at else None
-    )
+    shield_response = ShieldResponse.from_orm_trusted(updated_shield)
     
     return ShieldUpdateResponse(
         success=True,
@@ -213,7 +166,7 @@ async def update_shield(
 
 
 @router.patch("/{shield_key}", response_model=ShieldUpdateResponse)
-async def patch_shield_by_key(
+def patch_shield_by_key(
     shield_key: str,
     shield_data: ShieldUpdate,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
@@ -258,7 +211,7 @@ async def patch_shield_by_key(
             shield_id=shield.id,
             name=shield_data.name,
             description=shield_data.description,
-            content=shield_data.content,
+            content=shield_data.content.model_dump() if shield_data.content else None,
             is_active=shield_data.is_active
         )
     except ValueError as e:
@@ -273,19 +226,7 @@ async def patch_shield_by_key(
             detail="Failed to update shield"
         )
     
-    shield_response = ShieldResponse(
-        id=updated_shield.id,
-        shield_key=updated_shield.shield_key,
-        name=updated_shield.name,
-        description=updated_shield.description,
-        prompt_description=updated_shield.prompt_description,
-        what_to_block=updated_shield.what_to_block,
-        what_not_to_block=updated_shield.what_not_to_block,
-        owner_id=updated_shield.owner_id,
-        is_active=updated_shield.is_active,
-        created_at=updated_shield.created_at.isoformat() if updated_shield.created_at else "",
-        updated_at=updated_shield.updated_at.isoformat() if updated_shield.updated_at else None
-    )
+    shield_response = ShieldResponse.from_orm_trusted(updated_shield)
     
     return ShieldUpdateResponse(
         success=True,
@@ -295,7 +236,7 @@ async def patch_shield_by_key(
 
 
 @router.delete("/{shield_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_shield(
+def delete_shield(
     shield_id: int,
     user_info: LMNRUserInfo = Depends(get_lmnr_user_info),
     db: Session = Depends(get_db)
@@ -344,8 +285,8 @@ async def analyze_with_shield(
     Returns:
         ShieldAnalyzeResponse with BLOCK/ALLOW decision and optional reason
     """
-    # Load shield from database
-    shield = ShieldRepository.get_by_key(db, shield_key)
+    # Load shield from database (sync SQLAlchemy, so off the event loop)
+    shield = await asyncio.to_thread(ShieldRepository.get_by_key, db, shield_key)
     if not shield:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -386,18 +327,16 @@ Your task:
 
 Be precise and only block content that clearly matches the blocking criteria while respecting the exceptions."""
     
-    # Store original custom prompts
-    original_custom_prompts = pipeline.custom_prompts or {}
-    
-    # Set custom prompt for LLM analysis
-    pipeline.custom_prompts = {
+    # Per-request view with the shield prompt; the shared pipeline is never mutated
+    shield_pipeline = pipeline.with_policy(None, {
         "llm_agent_system_prompt": custom_prompt
-    }
+    })
     
     try:
         # Perform analysis using the pipeline with custom shield prompt
         # Pass content as function_result with a generic function name for pipeline compatibility
-        result = pipeline.analyze(
+        result = await run_analysis(
+            shield_pipeline,
             function_name="user_input",  # Generic function name for any text input
             function_result=request.content,  # The content to analyze
             function_args=None,
@@ -440,8 +379,3 @@ Be precise and only block content that clearly matches the blocking criteria whi
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
-    
-    finally:
-        # Restore original custom prompts
-        pipeline.custom_prompts = original_custom_prompts
-
@@ -2,15 +2,23 @@
 FastAPI server for hipocap-v1.
 """
 
+import anyio.to_thread
+import fastapi
+import pydantic
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import router, initialize_pipeline
+from .routes import router, initialize_pipeline, start_trace_writer, stop_trace_writer
 from .routes_policy import router as policy_router
 from .routes_shield import router as shield_router
+from .models import warmup_models, apply_field_descriptions
 from ..database.connection import init_db, engine
 from ..database.migrations import run_migrations
 import os
+import json
+import hashlib
 import logging
+from pathlib import Path
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -25,6 +33,90 @@ if not logging.root.handlers:
 # Load environment variables from .env file
 load_dotenv()
 
+# Threads for sync route handlers and dependencies (AnyIO's default is 40)
+THREADPOOL_SIZE = int(os.getenv("HIPOCAP_THREADPOOL_SIZE", "100"))
+
+# Generated OpenAPI document persisted across restarts; set to "" to disable
+OPENAPI_CACHE_PATH = os.getenv("HIPOCAP_OPENAPI_CACHE", "/var/cache/hipocap/openapi.json")
+
+
+def _openapi_cache_key(app: FastAPI) -> str:
+    """
+    Hash everything the generated OpenAPI document depends on.
+    
+    Args:
+        app: FastAPI application
+        
+    Returns:
+        Hex digest over the FastAPI/pydantic versions, app metadata and API sources
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{fastapi.__version__}|{pydantic.VERSION}|{app.title}|{app.version}".encode())
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _install_field_descriptions(app: FastAPI) -> None:
+    """
+    Add the field descriptions kept out of the per-request models to the OpenAPI document.
+    
+    Args:
+        app: FastAPI application
+    """
+    generate_openapi = app.openapi
+    
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema:
+            return app.openapi_schema
+        schema = generate_openapi()
+        apply_field_descriptions(schema)
+        return schema
+    
+    app.openapi = openapi
+
+
+def _install_openapi_cache(app: FastAPI, cache_path: str) -> None:
+    """
+    Serve the OpenAPI document from a disk cache when the API sources are unchanged.
+    
+    FastAPI builds the document by generating the JSON schema of every model on the
+    first /docs or /openapi.json hit; with the cache that happens once per release
+    instead of once per worker start.
+    
+    Args:
+        app: FastAPI application
+        cache_path: Path of the cache file
+    """
+    generate_openapi = app.openapi
+    path = Path(cache_path)
+    
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema:
+            return app.openapi_schema
+        
+        key = _openapi_cache_key(app)
+        try:
+            cached = json.loads(path.read_bytes())
+            if cached.get("key") == key:
+                app.openapi_schema = cached["schema"]
+                return app.openapi_schema
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        
+        schema = generate_openapi()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"key": key, "schema": schema}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not write OpenAPI cache {path}: {e}")
+        return schema
+    
+    app.openapi = openapi
+
 
 def create_app(
     openai_api_key: str = None,
@@ -74,9 +166,19 @@ def create_app(
     app.include_router(policy_router)
     app.include_router(shield_router)
     
+    _install_field_descriptions(app)
+    if OPENAPI_CACHE_PATH:
+        _install_openapi_cache(app, OPENAPI_CACHE_PATH)
+    
     # Initialize database and pipeline on startup
     @app.on_event("startup")
     async def startup_event():
+        # Database-backed routes are plain def handlers; give them room beyond 40 threads
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+        
+        # Build the lazily-built (defer_build) API models before serving traffic
+        warmup_models()
+        
         # Initialize database tables
         try:
             init_db()
@@ -98,8 +200,8 @@ def create_app(
             logger.error(f"Warning: Database initialization failed: {e}")
             logger.warning("Continuing without database (some features may not work)")
         
-        # Initialize pipeline
-        initialize_pipeline(
+        # Initialize the pipeline once; its single Prompt Guard model is shared by all requests
+        app.state.pipeline = initialize_pipeline(
             openai_api_key=openai_api_key,
             openai_base_url=openai_base_url,
             openai_model=openai_model,
@@ -110,6 +212,19 @@ def create_app(
             hf_token=hf_token,
             **pipeline_kwargs
         )
+        
+        # Batch analysis trace inserts instead of committing once per request
+        start_trace_writer()
+    
+    @app.on_event("shutdown")
+    def shutdown_event():
+        # Flush traces still waiting in the writer's queue
+        stop_trace_writer()
+        
+        # Stop the analyzer's micro-batching worker
+        pipeline = getattr(app.state, "pipeline", None)
+        if pipeline is not None:
+            pipeline.close()
     
     return app
 
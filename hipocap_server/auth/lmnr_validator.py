@@ -5,7 +5,8 @@ Validates API keys and retrieves user information from LMNR database.
 """
 
 import os
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from fastapi import HTTPException, status
@@ -16,6 +17,13 @@ _lmnr_engine = None
 _lmnr_session_factory = None
 
 
+# Users resolved by API key, kept briefly so repeat requests skip the LMNR query.
+# Only hits are cached; a revoked key keeps working for at most the TTL.
+USER_BY_KEY_CACHE_TTL = float(os.getenv("LMNR_USER_CACHE_TTL", "30"))
+USER_BY_KEY_CACHE_SIZE = int(os.getenv("LMNR_USER_CACHE_SIZE", "4096"))
+_user_by_key_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
 def _running_in_docker() -> bool:
     return os.path.exists("/.dockerenv") or os.getenv("RUNNING_IN_DOCKER") == "1"
 
@@ -140,6 +148,10 @@ def get_lmnr_user_by_api_key(api_key: str) -> Optional[Dict[str, Any]]:
     if not api_key:
         return None
     
+    cached = _user_by_key_cache.get(api_key)
+    if cached is not None and cached[0] > time.monotonic():
+        return dict(cached[1])
+    
     try:
         db = get_lmnr_db()
         try:
@@ -157,11 +169,16 @@ def get_lmnr_user_by_api_key(api_key: str) -> Optional[Dict[str, Any]]:
             ).fetchone()
             
             if result:
-                return {
+                user = {
                     "id": str(result[0]),  # Convert UUID to string
                     "email": result[1],
                     "name": result[2]
                 }
+                if USER_BY_KEY_CACHE_TTL > 0:
+                    if len(_user_by_key_cache) >= USER_BY_KEY_CACHE_SIZE:
+                        _user_by_key_cache.clear()
+                    _user_by_key_cache[api_key] = (time.monotonic() + USER_BY_KEY_CACHE_TTL, user)
+                return dict(user)
             
             return None
         finally:
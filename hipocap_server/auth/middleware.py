@@ -7,6 +7,7 @@ Reads user information from HTTP headers sent by LMNR proxy routes.
 from fastapi import Depends, HTTPException, status, Header, Request
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
+import asyncio
 from ..auth.lmnr_validator import validate_lmnr_api_key, get_lmnr_user_by_api_key, get_lmnr_user_by_id
 
 
@@ -19,7 +20,7 @@ class LMNRUserInfo:
     api_key: Optional[str] = None
 
 
-def get_lmnr_user_info(
+async def get_lmnr_user_info(
     request: Request,
     x_lmnr_user_id: Optional[str] = Header(None, alias="X-LMNR-User-Id"),
     x_lmnr_user_email: Optional[str] = Header(None, alias="X-LMNR-User-Email"),
@@ -47,32 +48,41 @@ def get_lmnr_user_info(
     # Extract API key from Authorization header if not in custom header
     api_key = x_lmnr_api_key
     if not api_key and authorization:
-        if authorization.startswith("Bearer "):
-            api_key = authorization[7:]
-        else:
-            api_key = authorization
+        scheme, sep, token = authorization.partition(" ")
+        api_key = token if sep and scheme == "Bearer" else authorization
+    
+    # The key check and the user lookup are independent LMNR queries, so run them
+    # concurrently in the threadpool instead of one after the other
+    if x_lmnr_user_id:
+        lookup = asyncio.to_thread(get_lmnr_user_by_id, x_lmnr_user_id)
+    elif api_key:
+        # If we have API key but missing user info, try to get from database
+        lookup = asyncio.to_thread(get_lmnr_user_by_api_key, api_key)
+    else:
+        lookup = None
     
     # Validate API key if provided
     if api_key:
         # Note: validate_lmnr_api_key returns True (lenient) if database is unavailable
         # This prevents 401 errors during database outages
-        if not validate_lmnr_api_key(api_key):
+        is_valid, user_info = await asyncio.gather(
+            asyncio.to_thread(validate_lmnr_api_key, api_key),
+            lookup
+        )
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid API key",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # If we have API key but missing user info, try to get from database
-        if not x_lmnr_user_id:
-            user_info = get_lmnr_user_by_api_key(api_key)
-            if user_info:
-                return LMNRUserInfo(
-                    id=user_info["id"],
-                    email=user_info["email"],
-                    name=user_info["name"],
-                    api_key=api_key
-                )
+        if not x_lmnr_user_id and user_info:
+            return LMNRUserInfo(
+                id=user_info["id"],
+                email=user_info["email"],
+                name=user_info["name"],
+                api_key=api_key
+            )
     
     # Check if we have user info from headers
     if not x_lmnr_user_id:
@@ -83,7 +93,8 @@ def get_lmnr_user_info(
         )
     
     # Validate user exists in LMNR database (optional but recommended)
-    user_info = get_lmnr_user_by_id(x_lmnr_user_id)
+    if not api_key:
+        user_info = await lookup
     if not user_info:
         # If user not found in DB, use header values (trust the proxy)
         if not x_lmnr_user_email:
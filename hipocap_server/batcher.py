@@ -0,0 +1,121 @@
+"""
+Micro-batching queue for Prompt Guard scoring.
+
+Coalesces scoring requests coming from concurrent callers into a single
+batched forward pass, so concurrent traffic shares one model invocation
+instead of serializing one forward per request.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """
+    Background worker that drains pending scoring requests into batches.
+
+    Each caller submits a list of texts and blocks until its scores are ready.
+    The worker collects requests until either max_batch_size texts are pending
+    or max_wait_ms has elapsed since the first request, then scores them all
+    with a single call to score_fn.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[List[str]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "hipocap-micro-batcher"
+    ):
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+            score_fn: Function scoring a list of texts in one forward pass, one result per text
+            max_batch_size: Maximum number of texts per forward pass
+            max_wait_ms: Maximum time to wait for more requests after the first one
+            name: Name of the worker thread
+        """
+        self._score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._closed = False
+        # Orders submit() against close(), so no request is queued behind the sentinel
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> List[Any]:
+        """
+        Score texts as part of the next batch.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            List of per-text results from score_fn, in the same order as texts
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((texts, future))
+        return future.result()
+
+    def close(self) -> None:
+        """Stop the worker thread once pending requests have been served."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Gather requests following the first one until the batch is full or the wait expires."""
+        pending = [first]
+        pending_texts = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while pending_texts < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+            pending_texts += len(item[0])
+
+        return pending, False
+
+    def _run(self) -> None:
+        """Worker loop: drain the queue, run one forward per batch, resolve futures."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            pending, stop = self._collect(first)
+            texts = [text for item_texts, _ in pending for text in item_texts]
+
+            try:
+                scores = self._score_fn(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+            else:
+                offset = 0
+                for item_texts, future in pending:
+                    future.set_result(scores[offset:offset + len(item_texts)])
+                    offset += len(item_texts)
+
+            if stop:
+                return
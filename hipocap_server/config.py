@@ -358,6 +358,42 @@ class Config:
         """Get list of all defined functions."""
         return list(self.config.get("functions", {}).keys())
     
+    def get_guard_precision(self) -> Optional[str]:
+        """
+        Get the Prompt Guard forward precision.
+        
+        Returns:
+            'fp32', 'fp16' or 'bf16' if configured under guard_model.precision, None otherwise
+        """
+        return self.config.get("guard_model", {}).get("precision")
+    
+    def get_guard_quantize_cpu(self) -> bool:
+        """
+        Check whether Prompt Guard should be INT8-quantized when running on CPU.
+        
+        Returns:
+            Value of guard_model.quantize_cpu (default: True)
+        """
+        return self.config.get("guard_model", {}).get("quantize_cpu", True)
+    
+    def get_guard_backend(self) -> Optional[str]:
+        """
+        Get the Prompt Guard inference backend.
+        
+        Returns:
+            'pytorch' or 'onnxruntime' if configured under guard_model.backend, None otherwise
+        """
+        return self.config.get("guard_model", {}).get("backend")
+    
+    def get_guard_fast_path_config(self) -> Dict[str, Any]:
+        """
+        Get the Prompt Guard fast-path settings.
+        
+        Returns:
+            Dictionary with optional max_chars and keywords from guard_model.fast_path
+        """
+        return self.config.get("guard_model", {}).get("fast_path", {})
+    
     def get_llm_analysis_agent_config(self) -> Dict[str, Any]:
         """
         Get LLM analysis agent configuration.
@@ -375,15 +411,13 @@ class Config:
             roles: Dictionary of roles to add/update
             functions: Dictionary of function configurations to add/update
         """
+        # Copy-on-write: policy views built by GuardPipeline.with_policy share the
+        # nested dicts of this config, so they are replaced rather than mutated
         if roles:
-            if "roles" not in self.config:
-                self.config["roles"] = {}
-            self.config["roles"].update(roles)
+            self.config = {**self.config, "roles": {**self.config.get("roles", {}), **roles}}
         
         if functions:
-            if "functions" not in self.config:
-                self.config["functions"] = {}
-            self.config["functions"].update(functions)
+            self.config = {**self.config, "functions": {**self.config.get("functions", {}), **functions}}
     
     def add_role(self, role_name: str, permissions: List[str], description: str = None) -> None:
         """
@@ -394,13 +428,13 @@ class Config:
             permissions: List of function names the role can access (use "*" for all)
             description: Optional description of the role
         """
-        if "roles" not in self.config:
-            self.config["roles"] = {}
-        
-        self.config["roles"][role_name] = {
+        # Copy-on-write, see update_rbac
+        roles = dict(self.config.get("roles", {}))
+        roles[role_name] = {
             "permissions": permissions,
             "description": description or f"Role: {role_name}"
         }
+        self.config = {**self.config, "roles": roles}
     
     def add_function_permission(self, function_name: str, allowed_roles: List[str], 
                                 output_restrictions: Dict[str, Any] = None,
@@ -414,9 +448,6 @@ class Config:
             output_restrictions: Optional output restrictions for the function
             description: Optional description of the function
         """
-        if "functions" not in self.config:
-            self.config["functions"] = {}
-        
         func_config = {
             "allowed_roles": allowed_roles,
             "description": description or f"Function: {function_name}"
@@ -425,7 +456,10 @@ class Config:
         if output_restrictions:
             func_config["output_restrictions"] = output_restrictions
         
-        self.config["functions"][function_name] = func_config
+        # Copy-on-write, see update_rbac
+        functions = dict(self.config.get("functions", {}))
+        functions[function_name] = func_config
+        self.config = {**self.config, "functions": functions}
     
     def update_rbac(self, roles: Dict[str, Any] = None, functions: Dict[str, Any] = None) -> None:
         """
@@ -435,15 +469,13 @@ class Config:
             roles: Dictionary of roles to add/update
             functions: Dictionary of function configurations to add/update
         """
+        # Copy-on-write: policy views built by GuardPipeline.with_policy share the
+        # nested dicts of this config, so they are replaced rather than mutated
         if roles:
-            if "roles" not in self.config:
-                self.config["roles"] = {}
-            self.config["roles"].update(roles)
+            self.config = {**self.config, "roles": {**self.config.get("roles", {}), **roles}}
         
         if functions:
-            if "functions" not in self.config:
-                self.config["functions"] = {}
-            self.config["functions"].update(functions)
+            self.config = {**self.config, "functions": {**self.config.get("functions", {}), **functions}}
     
     def add_role(self, role_name: str, permissions: List[str], description: str = None) -> None:
         """
@@ -454,13 +486,13 @@ class Config:
             permissions: List of function names the role can access (use "*" for all)
             description: Optional description of the role
         """
-        if "roles" not in self.config:
-            self.config["roles"] = {}
-        
-        self.config["roles"][role_name] = {
+        # Copy-on-write, see update_rbac
+        roles = dict(self.config.get("roles", {}))
+        roles[role_name] = {
             "permissions": permissions,
             "description": description or f"Role: {role_name}"
         }
+        self.config = {**self.config, "roles": roles}
     
     def add_function_permission(self, function_name: str, allowed_roles: List[str], 
                                 output_restrictions: Dict[str, Any] = None,
@@ -474,9 +506,6 @@ class Config:
             output_restrictions: Optional output restrictions for the function
             description: Optional description of the function
         """
-        if "functions" not in self.config:
-            self.config["functions"] = {}
-        
         func_config = {
             "allowed_roles": allowed_roles,
             "description": description or f"Function: {function_name}"
@@ -485,7 +514,10 @@ class Config:
         if output_restrictions:
             func_config["output_restrictions"] = output_restrictions
         
-        self.config["functions"][function_name] = func_config
+        # Copy-on-write, see update_rbac
+        functions = dict(self.config.get("functions", {}))
+        functions[function_name] = func_config
+        self.config = {**self.config, "functions": functions}
 
 
 def load_config(config_path: str) -> Config:
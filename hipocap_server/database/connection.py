@@ -7,6 +7,11 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
 # Database configuration
 def _running_in_docker() -> bool:
     # Common, lightweight heuristic used by many Python apps.
@@ -30,12 +35,34 @@ if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 DATABASE_URL = database_url
 
+# Connection pool sizing. Each process (uvicorn worker) holds up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so keep
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres max_connections.
+# A short DB_POOL_TIMEOUT fails requests fast instead of queueing them when the
+# pool is exhausted.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+# JSON columns (trace responses, policy configs) are encoded and decoded with
+# orjson when it is installed instead of the stdlib json module
+_json_kwargs = {}
+if orjson is not None:
+    _json_kwargs = {
+        "json_serializer": lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode(),
+        "json_deserializer": orjson.loads,
+    }
+
 # Create engine with connection timeout parameters
 engine = create_engine(
     DATABASE_URL,
+    **_json_kwargs,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
     connect_args={
         "connect_timeout": 10,  # 10 second connection timeout
         "options": "-c statement_timeout=30000"  # 30 second statement timeout
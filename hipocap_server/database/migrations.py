@@ -116,6 +116,21 @@ def check_custom_prompts_needed(engine) -> bool:
     return not check_column_exists(engine, "governance_policies", "custom_prompts")
 
 
+def migrate_add_compiled_config(engine):
+    """Add compiled_config column to governance_policies table."""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE governance_policies 
+            ADD COLUMN compiled_config JSON
+        """))
+        conn.commit()
+
+
+def check_compiled_config_needed(engine) -> bool:
+    """Check if compiled_config migration is needed."""
+    return not check_column_exists(engine, "governance_policies", "compiled_config")
+
+
 def migrate_add_shields_table(engine):
     """Add shields table."""
     try:
@@ -340,6 +355,12 @@ MIGRATIONS: List[Migration] = [
         check_func=check_custom_prompts_needed,
         migrate_func=migrate_add_custom_prompts
     ),
+    Migration(
+        name="add_compiled_config",
+        description="Add compiled_config column to governance_policies table",
+        check_func=check_compiled_config_needed,
+        migrate_func=migrate_add_compiled_config
+    ),
     Migration(
         name="add_shields_table",
         description="Add shields table for custom blocking rules",
@@ -27,6 +27,7 @@ class GovernancePolicy(Base):
     context_rules = Column(JSON, nullable=True)  # Context rules
     decision_thresholds = Column(JSON, nullable=True)  # Decision thresholds for ALLOW/BLOCK (block_threshold, allow_threshold)
     custom_prompts = Column(JSON, nullable=True)  # Custom prompts configuration
+    compiled_config = Column(JSON, nullable=True)  # to_config_dict() result, rebuilt on every write
     
     # Metadata
     is_active = Column(Boolean, default=True)
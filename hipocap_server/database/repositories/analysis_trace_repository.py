@@ -5,7 +5,7 @@ Repository for analysis trace operations.
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, and_, or_, func, text, case
 from ..models import AnalysisTrace
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, date, time
 
 
@@ -13,8 +13,7 @@ class AnalysisTraceRepository:
     """Repository for analysis trace database operations."""
     
     @staticmethod
-    def create_trace(
-        db: Session,
+    def build_trace(
         user_id: str,  # Changed to UUID string
         api_key_id: Optional[str],  # Changed to string (API key name/ID from LMNR)
         request_data: Dict[str, Any],
@@ -24,10 +23,9 @@ class AnalysisTraceRepository:
         policy_key: Optional[str] = None
     ) -> AnalysisTrace:
         """
-        Create a new analysis trace.
+        Build an analysis trace row without adding it to a session.
         
         Args:
-            db: Database session
             user_id: User ID from API key
             api_key_id: API key ID
             request_data: Request data (function_name, user_query, etc.)
@@ -37,7 +35,7 @@ class AnalysisTraceRepository:
             policy_key: Policy key used (if any)
             
         Returns:
-            Created AnalysisTrace object
+            Transient AnalysisTrace object
         """
         # Extract key fields from response
         final_decision = response_data.get("final_decision", "ALLOWED")
@@ -61,7 +59,7 @@ class AnalysisTraceRepository:
         if response_data.get("llm_analysis"):
             llm_score = response_data["llm_analysis"].get("score")
         
-        trace = AnalysisTrace(
+        return AnalysisTrace(
             user_id=user_id,
             api_key_id=api_key_id,
             function_name=request_data.get("function_name"),
@@ -84,12 +82,60 @@ class AnalysisTraceRepository:
             ip_address=ip_address,
             user_agent=user_agent
         )
+    
+    @staticmethod
+    def create_trace(
+        db: Session,
+        user_id: str,  # Changed to UUID string
+        api_key_id: Optional[str],  # Changed to string (API key name/ID from LMNR)
+        request_data: Dict[str, Any],
+        response_data: Dict[str, Any],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        policy_key: Optional[str] = None
+    ) -> AnalysisTrace:
+        """
+        Create a new analysis trace.
         
+        Args:
+            db: Database session
+            user_id: User ID from API key
+            api_key_id: API key ID
+            request_data: Request data (function_name, user_query, etc.)
+            response_data: Full analysis response
+            ip_address: Client IP address
+            user_agent: User agent string
+            policy_key: Policy key used (if any)
+            
+        Returns:
+            Created AnalysisTrace object
+        """
+        trace = AnalysisTraceRepository.build_trace(
+            user_id=user_id,
+            api_key_id=api_key_id,
+            request_data=request_data,
+            response_data=response_data,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            policy_key=policy_key
+        )
         db.add(trace)
         db.commit()
         db.refresh(trace)
         return trace
     
+    @staticmethod
+    def create_traces(db: Session, traces: List[AnalysisTrace]) -> None:
+        """
+        Insert many traces built with build_trace in one transaction.
+        
+        Args:
+            db: Database session
+            traces: Transient AnalysisTrace objects
+        """
+        db.add_all(traces)
+        db.commit()
+    
     @staticmethod
     def get_by_id(db: Session, trace_id: int) -> Optional[AnalysisTrace]:
         """Get trace by ID."""
@@ -203,10 +249,13 @@ class AnalysisTraceRepository:
         final_decision: Optional[str] = None,
         limit: int = 50,
         offset: int = 0
-    ) -> List[AnalysisTrace]:
+    ) -> Tuple[List[AnalysisTrace], int]:
         """
         Get traces for compliance queries.
         
+        The total comes from a COUNT(*) OVER () window column on the page query,
+        so one round trip returns both the page and the number of matching rows.
+        
         Args:
             db: Database session
             user_id: User ID
@@ -218,7 +267,7 @@ class AnalysisTraceRepository:
             offset: Offset for pagination
             
         Returns:
-            List of AnalysisTrace objects
+            Tuple of (page of AnalysisTrace objects, total matching traces)
         """
         query = db.query(AnalysisTrace).filter(AnalysisTrace.user_id == user_id)
         
@@ -234,7 +283,18 @@ class AnalysisTraceRepository:
         if final_decision:
             query = query.filter(AnalysisTrace.final_decision == final_decision)
         
-        return query.order_by(desc(AnalysisTrace.created_at)).offset(offset).limit(limit).all()
+        rows = (
+            query.add_columns(func.count().over().label("total"))
+            .order_by(desc(AnalysisTrace.created_at))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        if rows:
+            return [trace for trace, _ in rows], rows[0].total
+        
+        # A page past the end has no rows to carry the window total
+        return [], query.count() if offset else 0
     
     @staticmethod
     def count_by_user(db: Session, user_id: str) -> int:  # Changed to UUID string
@@ -312,7 +372,7 @@ class AnalysisTraceRepository:
         user_id: str,  # Changed to UUID string
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> Dict[str, Dict[str, int]]:
+    ) -> List[Dict[str, Any]]:
         """
         Get statistics grouped by function_name and final_decision.
         
@@ -323,7 +383,8 @@ class AnalysisTraceRepository:
             end_date: End date filter
             
         Returns:
-            Dictionary mapping function_name to stats dict
+            List of per-function buckets (name, blocked, allowed, review_required, total),
+            ordered by function name
         """
         query = db.query(
             AnalysisTrace.function_name,
@@ -337,26 +398,32 @@ class AnalysisTraceRepository:
         if end_date:
             query = query.filter(AnalysisTrace.created_at <= datetime.combine(end_date, datetime.max.time()))
         
-        results = query.group_by(AnalysisTrace.function_name, AnalysisTrace.final_decision).all()
+        results = query.group_by(
+            AnalysisTrace.function_name, AnalysisTrace.final_decision
+        ).order_by(AnalysisTrace.function_name).all()
         
-        by_function: Dict[str, Dict[str, int]] = {}
+        # Rows arrive sorted by function, so each bucket is complete once the name changes
+        by_function: List[Dict[str, Any]] = []
+        bucket: Optional[Dict[str, Any]] = None
         
         for function_name, decision, count in results:
-            if function_name not in by_function:
-                by_function[function_name] = {
+            if bucket is None or bucket["name"] != function_name:
+                bucket = {
+                    "name": function_name,
                     "blocked": 0,
                     "allowed": 0,
                     "review_required": 0,
                     "total": 0
                 }
+                by_function.append(bucket)
             
-            by_function[function_name]["total"] += count
+            bucket["total"] += count
             if decision == "BLOCKED":
-                by_function[function_name]["blocked"] = count
+                bucket["blocked"] = count
             elif decision == "ALLOWED":
-                by_function[function_name]["allowed"] = count
+                bucket["allowed"] = count
             elif decision == "REVIEW_REQUIRED":
-                by_function[function_name]["review_required"] = count
+                bucket["review_required"] = count
         
         return by_function
     
@@ -420,14 +487,14 @@ class AnalysisTraceRepository:
         
         results = query.group_by(timestamp_expr).order_by(timestamp_expr).all()
         
-        # Convert to list of dicts
-        time_series = []
-        for row in results:
-            time_series.append({
-                "timestamp": row.timestamp.isoformat() if row.timestamp else None,
-                "blocked": int(row.blocked_count or 0),
-                "allowed": int(row.allowed_count or 0)
-            })
-        
-        return time_series
+        # Plain dicts, encoded directly by the route; rows are unpacked positionally
+        # instead of through per-column attribute lookups on each Row
+        return [
+            {
+                "timestamp": timestamp.isoformat() if timestamp else None,
+                "blocked": int(blocked_count or 0),
+                "allowed": int(allowed_count or 0)
+            }
+            for timestamp, blocked_count, allowed_count in results
+        ]
 
@@ -3,8 +3,94 @@ Repository for governance policy operations.
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from ..models import GovernancePolicy
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple, Hashable
+from collections import OrderedDict
+import os
+import threading
+import time
+
+
+class PolicySnapshot(NamedTuple):
+    """Detached view of a policy with its config dict already built, safe to cache across sessions."""
+    
+    policy_key: str
+    owner_id: str
+    is_active: bool
+    config: Dict[str, Any]
+    custom_prompts: Optional[Dict[str, str]]
+
+
+class PolicyCache:
+    """
+    Thread-safe LRU cache with a time-to-live for resolved policies.
+    
+    Writes through PolicyRepository clear the whole cache, since one write can change
+    which policy several keys resolve to (defaults, global policies). Other worker
+    processes only see a write once their entries expire, so ttl bounds staleness.
+    """
+    
+    def __init__(self, maxsize: int = 2048, ttl: float = 30.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid; 0 disables caching
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, PolicySnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[PolicySnapshot]:
+        """Return the cached snapshot for key, or None if missing or expired."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+    
+    def put(self, key: Hashable, snapshot: PolicySnapshot) -> None:
+        """Cache snapshot under key, evicting the least recently used entry when full."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _default_severity_rules() -> Dict[str, Dict[str, bool]]:
+    """Severity rules given to policies created without any."""
+    return {
+        "safe": {"allow_function_calls": True, "allow_output_use": True, "block": False},
+        "low": {"allow_function_calls": True, "allow_output_use": True, "block": False},
+        "medium": {"allow_function_calls": False, "allow_output_use": True, "block": False},
+        "high": {"allow_function_calls": False, "allow_output_use": False, "block": True},
+        "critical": {"allow_function_calls": False, "allow_output_use": False, "block": True}
+    }
+
+
+# Process-wide cache of policies resolved by the analyze route
+POLICY_CACHE = PolicyCache(
+    maxsize=int(os.getenv("POLICY_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("POLICY_CACHE_TTL", "30"))
+)
 
 
 class PolicyRepository:
@@ -37,13 +123,7 @@ class PolicyRepository:
         
         # Provide default values for required sections
         if severity_rules is None:
-            severity_rules = {
-                "safe": {"allow_function_calls": True, "allow_output_use": True, "block": False},
-                "low": {"allow_function_calls": True, "allow_output_use": True, "block": False},
-                "medium": {"allow_function_calls": False, "allow_output_use": True, "block": False},
-                "high": {"allow_function_calls": False, "allow_output_use": False, "block": True},
-                "critical": {"allow_function_calls": False, "allow_output_use": False, "block": True}
-            }
+            severity_rules = _default_severity_rules()
         
         if roles is None:
             roles = {}
@@ -66,11 +146,89 @@ class PolicyRepository:
             custom_prompts=custom_prompts,
             is_default=is_default
         )
+        policy.compiled_config = PolicyRepository.to_config_dict(policy)
         db.add(policy)
         db.commit()
         db.refresh(policy)
+        POLICY_CACHE.clear()
         return policy
     
+    @staticmethod
+    def get_or_create_default(
+        db: Session,
+        owner_id: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> GovernancePolicy:
+        """
+        Get the owner's "default" policy, creating it with standard settings if missing.
+        
+        Concurrent first requests for one owner race to create the row. The insert
+        uses ON CONFLICT DO NOTHING on (policy_key, owner_id), so the losers read
+        the winner's row instead of failing with an IntegrityError.
+        
+        Args:
+            db: Database session
+            owner_id: LMNR user ID of the owner
+            config: Optional policy sections for a newly created policy (e.g. from
+                build_default_config); defaults to no roles or functions and the
+                standard severity rules
+            
+        Returns:
+            The owner's "default" policy
+        """
+        config = config or {}
+        policy = GovernancePolicy(
+            policy_key="default",
+            name="Default Policy",
+            description="Automatically created default policy with standard security settings.",
+            owner_id=owner_id,
+            roles=config.get("roles", {}),
+            functions=config.get("functions", {}),
+            severity_rules=config.get("severity_rules") or _default_severity_rules(),
+            output_restrictions=config.get("output_restrictions"),
+            function_chaining=config.get("function_chaining"),
+            context_rules=config.get("context_rules"),
+            decision_thresholds=config.get("decision_thresholds"),
+            custom_prompts=config.get("custom_prompts"),
+            is_active=True,
+            is_default=True
+        )
+        inserted_id = db.execute(
+            pg_insert(GovernancePolicy)
+            .values(
+                policy_key=policy.policy_key,
+                name=policy.name,
+                description=policy.description,
+                owner_id=policy.owner_id,
+                roles=policy.roles,
+                functions=policy.functions,
+                severity_rules=policy.severity_rules,
+                output_restrictions=policy.output_restrictions,
+                function_chaining=policy.function_chaining,
+                context_rules=policy.context_rules,
+                decision_thresholds=policy.decision_thresholds,
+                custom_prompts=policy.custom_prompts,
+                compiled_config=PolicyRepository.to_config_dict(policy),
+                is_active=policy.is_active,
+                is_default=policy.is_default
+            )
+            .on_conflict_do_nothing(index_elements=["policy_key", "owner_id"])
+            .returning(GovernancePolicy.id)
+        ).scalar()
+        
+        if inserted_id is not None:
+            # The new row is now the owner's default
+            db.query(GovernancePolicy).filter(
+                GovernancePolicy.owner_id == owner_id,
+                GovernancePolicy.is_default == True,
+                GovernancePolicy.id != inserted_id
+            ).update({"is_default": False})
+        db.commit()
+        if inserted_id is not None:
+            POLICY_CACHE.clear()
+        
+        return PolicyRepository.get_by_key(db, "default", owner_id=owner_id)
+    
     @staticmethod
     def get_by_key(db: Session, policy_key: str, owner_id: str = None) -> Optional[GovernancePolicy]:
         """Get policy by key (optionally filtered by owner)."""
@@ -83,10 +241,13 @@ class PolicyRepository:
     
     @staticmethod
     def get_by_id(db: Session, policy_id: int) -> Optional[GovernancePolicy]:
-        """Get policy by ID."""
-        return db.query(GovernancePolicy).filter(
-            GovernancePolicy.id == policy_id
-        ).first()
+        """
+        Get policy by ID.
+        
+        Uses the session's identity map, so a policy already loaded in this session
+        (e.g. by a route's ownership check) is returned without another query.
+        """
+        return db.get(GovernancePolicy, policy_id)
     
     @staticmethod
     def get_default(db: Session, owner_id: str = None) -> Optional[GovernancePolicy]:
@@ -367,8 +528,10 @@ class PolicyRepository:
                 ).update({"is_default": False})
             policy.is_default = is_default
         
+        policy.compiled_config = PolicyRepository.to_config_dict(policy)
         db.commit()
         db.refresh(policy)
+        POLICY_CACHE.clear()
         return policy, changes
     
     @staticmethod
@@ -380,8 +543,76 @@ class PolicyRepository:
         
         db.delete(policy)
         db.commit()
+        POLICY_CACHE.clear()
         return True
     
+    @staticmethod
+    def _delete_section_entry(
+        db: Session,
+        policy_id: int,
+        section: str,
+        key: str
+    ) -> Optional[GovernancePolicy]:
+        """
+        Remove one entry from a dict-valued policy section.
+        
+        Args:
+            db: Database session
+            policy_id: Policy ID
+            section: Name of the JSON column (e.g. "roles")
+            key: Entry to remove
+            
+        Returns:
+            Updated policy, or None if the policy or entry does not exist
+        """
+        policy = PolicyRepository.get_by_id(db, policy_id)
+        entries = getattr(policy, section) if policy else None
+        if not entries or key not in entries:
+            return None
+        
+        # Assign a new dict so the JSON column is detected as changed
+        setattr(policy, section, {name: value for name, value in entries.items() if name != key})
+        policy.compiled_config = PolicyRepository.to_config_dict(policy)
+        db.commit()
+        db.refresh(policy)
+        POLICY_CACHE.clear()
+        return policy
+    
+    @staticmethod
+    def delete_role(db: Session, policy_id: int, role_name: str) -> Optional[GovernancePolicy]:
+        """Delete a role from a policy; returns None if the policy or role does not exist."""
+        return PolicyRepository._delete_section_entry(db, policy_id, "roles", role_name)
+    
+    @staticmethod
+    def delete_function(db: Session, policy_id: int, function_name: str) -> Optional[GovernancePolicy]:
+        """Delete a function from a policy; returns None if the policy or function does not exist."""
+        return PolicyRepository._delete_section_entry(db, policy_id, "functions", function_name)
+    
+    @staticmethod
+    def delete_severity_rule(db: Session, policy_id: int, severity_level: str) -> Optional[GovernancePolicy]:
+        """Delete a severity rule from a policy; returns None if the policy or rule does not exist."""
+        return PolicyRepository._delete_section_entry(db, policy_id, "severity_rules", severity_level)
+    
+    @staticmethod
+    def delete_function_chaining(db: Session, policy_id: int, source_function: str) -> Optional[GovernancePolicy]:
+        """Delete a function chaining rule from a policy; returns None if the policy or rule does not exist."""
+        return PolicyRepository._delete_section_entry(db, policy_id, "function_chaining", source_function)
+    
+    @staticmethod
+    def delete_context_rule(db: Session, policy_id: int, rule_index: int) -> Optional[GovernancePolicy]:
+        """Delete a context rule by index; returns None if the policy or index does not exist."""
+        policy = PolicyRepository.get_by_id(db, policy_id)
+        rules = policy.context_rules if policy else None
+        if not rules or not 0 <= rule_index < len(rules):
+            return None
+        
+        policy.context_rules = rules[:rule_index] + rules[rule_index + 1:]
+        policy.compiled_config = PolicyRepository.to_config_dict(policy)
+        db.commit()
+        db.refresh(policy)
+        POLICY_CACHE.clear()
+        return policy
+    
     @staticmethod
     def to_config_dict(policy: GovernancePolicy) -> Dict[str, Any]:
         """Convert policy to config dictionary format."""
@@ -405,4 +636,23 @@ class PolicyRepository:
             config["decision_thresholds"] = policy.decision_thresholds
         
         return config
-
+    
+    @staticmethod
+    def snapshot(policy: GovernancePolicy) -> PolicySnapshot:
+        """
+        Build a detached snapshot of a policy for caching.
+        
+        Args:
+            policy: Policy loaded from the database
+            
+        Returns:
+            PolicySnapshot holding the policy's config dict and custom prompts
+        """
+        return PolicySnapshot(
+            policy_key=policy.policy_key,
+            owner_id=policy.owner_id,
+            is_active=policy.is_active,
+            # Rows written before compiled_config existed are built on the fly
+            config=policy.compiled_config or PolicyRepository.to_config_dict(policy),
+            custom_prompts=policy.custom_prompts
+        )
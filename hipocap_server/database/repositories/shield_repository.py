@@ -4,7 +4,7 @@ Repository for shield operations.
 
 from sqlalchemy.orm import Session
 from ..models import Shield
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Union
 import json
 
 
@@ -12,12 +12,13 @@ class ShieldRepository:
     """Repository for shield database operations."""
     
     @staticmethod
-    def parse_content(content: str) -> Tuple[str, str, str]:
+    def parse_content(content: Union[str, Dict[str, Any]]) -> Tuple[str, str, str]:
         """
-        Parse JSON content string to extract shield fields.
+        Parse shield content to extract shield fields.
         
         Args:
-            content: JSON string containing prompt_description, what_to_block, what_not_to_block
+            content: Dict (already parsed by the API models) or JSON string containing
+                prompt_description, what_to_block, what_not_to_block
             
         Returns:
             Tuple of (prompt_description, what_to_block, what_not_to_block)
@@ -25,10 +26,13 @@ class ShieldRepository:
         Raises:
             ValueError: If JSON is invalid or required fields are missing
         """
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {str(e)}")
+        if isinstance(content, str):
+            try:
+                data = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON format: {str(e)}")
+        else:
+            data = content
         
         prompt_description = data.get("prompt_description")
         what_to_block = data.get("what_to_block")
@@ -49,7 +53,7 @@ class ShieldRepository:
         shield_key: str,
         name: str,
         owner_id: str,
-        content: str,
+        content: Union[str, Dict[str, Any]],
         description: str = None
     ) -> Shield:
         """
@@ -60,7 +64,7 @@ class ShieldRepository:
             shield_key: Unique identifier for the shield
             name: Human-readable name
             owner_id: LMNR user UUID as string
-            content: JSON string containing prompt_description, what_to_block, what_not_to_block
+            content: Dict or JSON string containing prompt_description, what_to_block, what_not_to_block
             description: Optional description
             
         Returns:
@@ -119,7 +123,7 @@ class ShieldRepository:
         shield_id: int,
         name: str = None,
         description: str = None,
-        content: str = None,
+        content: Union[str, Dict[str, Any]] = None,
         is_active: bool = None
     ) -> Tuple[Optional[Shield], Dict[str, Any]]:
         """
@@ -130,7 +134,7 @@ class ShieldRepository:
             shield_id: Shield ID to update
             name: New name (optional)
             description: New description (optional)
-            content: New JSON content (optional)
+            content: New content as a dict or JSON string (optional)
             is_active: Active status (optional)
             
         Returns:
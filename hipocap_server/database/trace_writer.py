@@ -0,0 +1,144 @@
+"""
+Batched writer for analysis traces.
+
+Collects traces submitted by concurrent requests and inserts them in one
+transaction per batch, so sustained analyze traffic costs one commit per batch
+instead of one commit per request.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .connection import SessionLocal
+from .repositories.analysis_trace_repository import AnalysisTraceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TraceWriter:
+    """
+    Background worker that drains submitted traces into batched inserts.
+
+    The worker collects traces until either max_batch_size are pending or
+    max_wait_ms has elapsed since the first one, then inserts them all with
+    AnalysisTraceRepository.create_traces in its own session. If the batch
+    insert fails, the traces are retried one per transaction so only the bad
+    rows are lost.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 500,
+        max_wait_ms: float = 200.0,
+        max_queue_size: int = 10000,
+        name: str = "hipocap-trace-writer"
+    ):
+        """
+        Initialize the writer and start its worker thread.
+
+        Args:
+            max_batch_size: Maximum number of traces per insert
+            max_wait_ms: Maximum time to wait for more traces after the first one
+            max_queue_size: Maximum number of traces waiting to be written
+            name: Name of the worker thread
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        # Orders submit() against close(), so no trace is queued behind the sentinel
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, trace_kwargs: Dict[str, Any]) -> bool:
+        """
+        Queue a trace for the next batch without blocking.
+
+        Args:
+            trace_kwargs: Keyword arguments for AnalysisTraceRepository.build_trace
+
+        Returns:
+            True if queued, False if the writer is closed or the queue is full
+            (the caller should then write the trace itself)
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            try:
+                self._queue.put_nowait(trace_kwargs)
+            except queue.Full:
+                return False
+        return True
+
+    def close(self) -> None:
+        """Stop the worker thread once queued traces have been written."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Gather traces following the first one until the batch is full or the wait expires."""
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+
+        return pending, False
+
+    def _run(self) -> None:
+        """Worker loop: drain the queue and insert one batch per transaction."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            pending, stop = self._collect(first)
+            self._write(pending)
+
+            if stop:
+                return
+
+    def _write(self, pending: List[Dict[str, Any]]) -> None:
+        """Insert a batch in one transaction, falling back to one transaction per trace."""
+        db = SessionLocal()
+        try:
+            try:
+                AnalysisTraceRepository.create_traces(
+                    db, [AnalysisTraceRepository.build_trace(**kwargs) for kwargs in pending]
+                )
+                return
+            except Exception:
+                db.rollback()
+                logger.warning(
+                    "Failed to save a batch of %d analysis traces, retrying one by one",
+                    len(pending),
+                    exc_info=True
+                )
+
+            for kwargs in pending:
+                try:
+                    AnalysisTraceRepository.create_traces(
+                        db, [AnalysisTraceRepository.build_trace(**kwargs)]
+                    )
+                except Exception:
+                    db.rollback()
+                    logger.exception("Failed to save analysis trace")
+        finally:
+            db.close()
@@ -4,9 +4,8 @@ Guard Pipeline for detecting contextual blending attacks.
 Flow: Input Analysis → LLM Analysis Agent (Structured) → Quarantine LLM → Output Analysis
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from .analyzer import Analyzer, SeverityLevel
-from .scorer import Scorer
 from .config import Config
 from .prompts import (
     QUARANTINE_SYSTEM_PROMPT_DEFAULT,
@@ -20,6 +19,8 @@ from .prompts import (
     format_quarantine_stage2_user_prompt_with_schema
 )
 import openai
+import copy
+import functools
 import json
 import time
 import os
@@ -29,6 +30,35 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Maximum number of per-policy pipeline views kept by GuardPipeline.with_policy
+POLICY_VIEW_CACHE_SIZE = int(os.getenv("POLICY_VIEW_CACHE_SIZE", "1024"))
+
+# Keywords checked by _detect_keywords when the request does not supply its own
+DEFAULT_SENSITIVE_KEYWORDS = (
+    # Security classifications
+    "confidential", "classified", "top secret", "restricted", "sensitive",
+    "for internal use only", "do not distribute", "need-to-know",
+    # Business sensitivity
+    "proprietary", "trade secret", "internal use only",
+    "do not share", "confidential business information",
+    # Action-triggering
+    "password reset", "account verification", "urgent action required",
+    "click here", "verify now", "immediate action needed",
+    "your account will be closed", "suspicious activity detected",
+    # Financial
+    "wire transfer", "payment required", "refund processing",
+    "account suspended", "payment failed",
+    # Personal information indicators
+    "ssn", "social security number", "credit card",
+    "date of birth", "mother's maiden name"
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _lowered_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lower-case a keyword list once per distinct list instead of on every request."""
+    return tuple(keyword.lower() for keyword in keywords)
+
 
 class GuardPipeline:
     """
@@ -66,7 +96,15 @@ class GuardPipeline:
         config_path: Optional[str] = None,
         config: Optional[Config] = None,
         # HuggingFace token
-        hf_token: Optional[str] = None
+        hf_token: Optional[str] = None,
+        # Prompt Guard micro-batching
+        enable_micro_batching: bool = False,
+        # Prompt Guard forward precision
+        precision: Optional[str] = None,
+        # INT8 quantization of Prompt Guard on CPU
+        quantize_cpu: Optional[bool] = None,
+        # Prompt Guard inference backend
+        backend: Optional[str] = None
     ):
         """
         Initialize the Guard Pipeline.
@@ -90,7 +128,23 @@ class GuardPipeline:
             config_path: Path to JSON configuration file for RBAC and rules
             config: Optional pre-loaded Config instance
             hf_token: HuggingFace token for accessing private/gated models (or set HF_TOKEN env var)
+            enable_micro_batching: Coalesce concurrent Prompt Guard calls into shared forward passes (or set GUARD_MICRO_BATCHING env var)
+            precision: Prompt Guard forward precision 'fp32', 'fp16' or 'bf16' (or set GUARD_PRECISION env var / config "guard_model.precision")
+            quantize_cpu: INT8-quantize Prompt Guard when running on CPU (or set GUARD_QUANTIZE_CPU env var / config "guard_model.quantize_cpu", default on)
+            backend: Prompt Guard inference backend 'pytorch' or 'onnxruntime' (or set GUARD_BACKEND env var / config "guard_model.backend")
         """
+        # Load configuration if provided
+        self.config = config
+        if config_path and not config:
+            try:
+                self.config = Config(config_path)
+                if verbose:
+                    print(f"[Config] Loaded configuration from {config_path}")
+            except Exception as e:
+                if verbose:
+                    print(f"[Config] Warning: Could not load config: {e}")
+                self.config = None
+        
         # Load configuration from environment variables with fallbacks
         # Guard model (Prompt Guard)
         guard_model = model_id or os.getenv("GUARD_MODEL", "meta-llama/Prompt-Guard-86M")
@@ -113,6 +167,41 @@ class GuardPipeline:
                 if verbose:
                     print("[Config] Error checking CUDA availability, using CPU")
         
+        # Micro-batching of Prompt Guard forwards (useful under concurrent traffic)
+        enable_micro_batching = enable_micro_batching or os.getenv("GUARD_MICRO_BATCHING", "").lower() in ("1", "true", "yes")
+        
+        # Prompt Guard forward precision (fp32, fp16 or bf16)
+        precision = (
+            precision
+            or os.getenv("GUARD_PRECISION")
+            or (self.config.get_guard_precision() if self.config else None)
+            or "fp32"
+        ).lower()
+        
+        # INT8 dynamic quantization when Prompt Guard runs on CPU (default on)
+        if quantize_cpu is None:
+            quantize_env = os.getenv("GUARD_QUANTIZE_CPU")
+            if quantize_env is not None:
+                quantize_cpu = quantize_env.lower() in ("1", "true", "yes")
+            else:
+                quantize_cpu = self.config.get_guard_quantize_cpu() if self.config else True
+        
+        # Prompt Guard inference backend (pytorch, or onnxruntime for CPU)
+        backend = (
+            backend
+            or os.getenv("GUARD_BACKEND")
+            or (self.config.get_guard_backend() if self.config else None)
+            or "pytorch"
+        ).lower()
+        
+        # Fast path for trivially safe texts (short strings, plain identifiers)
+        fast_path = self.config.get_guard_fast_path_config() if self.config else {}
+        fast_path_kwargs = {}
+        if "max_chars" in fast_path:
+            fast_path_kwargs["fast_path_max_chars"] = fast_path["max_chars"]
+        if fast_path.get("keywords"):
+            fast_path_kwargs["fast_path_keywords"] = fast_path["keywords"]
+        
         # HuggingFace token for model downloads
         hf_token_value = hf_token or os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACE_TOKEN")
         
@@ -135,14 +224,16 @@ class GuardPipeline:
             model_id=guard_model,
             device=device,
             temperature=temperature,
-            hf_token=hf_token_value
-        )
-        self.scorer = Scorer(
-            model_id=guard_model,
-            device=device,
-            temperature=temperature,
-            hf_token=hf_token_value
+            hf_token=hf_token_value,
+            enable_micro_batching=enable_micro_batching,
+            precision=precision,
+            quantize_cpu=quantize_cpu,
+            backend=backend,
+            **fast_path_kwargs
         )
+        # The Analyzer exposes the Scorer API, so plain-text scoring shares the same
+        # model instance instead of loading a second copy of Prompt Guard
+        self.scorer = self.analyzer
         
         # Input analysis thresholds
         self.input_safe_threshold = input_safe_threshold
@@ -188,18 +279,6 @@ class GuardPipeline:
         # However, we use a more neutral prompt to reduce false positives on benign content
         self.quarantine_system_prompt = quarantine_system_prompt or QUARANTINE_SYSTEM_PROMPT_DEFAULT
         
-        # Load configuration if provided
-        self.config = config
-        if config_path and not config:
-            try:
-                self.config = Config(config_path)
-                if verbose:
-                    print(f"[Config] Loaded configuration from {config_path}")
-            except Exception as e:
-                if verbose:
-                    print(f"[Config] Warning: Could not load config: {e}")
-                self.config = None
-        
         # LLM Analysis Agent settings
         self.enable_llm_agent = False
         self.llm_agent_model = self.analysis_model  # Use analysis model for LLM agent
@@ -209,6 +288,9 @@ class GuardPipeline:
         # Custom prompts from policy (will override defaults if set)
         self.custom_prompts = None
         
+        # Views built by with_policy, keyed by id() of the policy config dict
+        self._policy_views: Dict[int, Tuple[Dict[str, Any], Optional[Dict[str, Any]], "GuardPipeline"]] = {}
+        
         if self.config:
             llm_agent_config = self.config.get_llm_analysis_agent_config()
             if llm_agent_config.get('enabled', False):
@@ -252,24 +334,7 @@ class GuardPipeline:
         """
         # Default sensitive keywords if not provided
         if keywords is None:
-            keywords = [
-                # Security classifications
-                "confidential", "classified", "top secret", "restricted", "sensitive",
-                "for internal use only", "do not distribute", "need-to-know",
-                # Business sensitivity
-                "proprietary", "trade secret", "internal use only",
-                "do not share", "confidential business information",
-                # Action-triggering
-                "password reset", "account verification", "urgent action required",
-                "click here", "verify now", "immediate action needed",
-                "your account will be closed", "suspicious activity detected",
-                # Financial
-                "wire transfer", "payment required", "refund processing",
-                "account suspended", "payment failed",
-                # Personal information indicators
-                "ssn", "social security number", "credit card",
-                "date of birth", "mother's maiden name"
-            ]
+            keywords = DEFAULT_SENSITIVE_KEYWORDS
         
         # Convert function_result to string for searching
         if isinstance(function_result, (dict, list)):
@@ -281,15 +346,13 @@ class GuardPipeline:
         detected_keywords = []
         keyword_positions = {}
         
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            # Find all occurrences
-            pattern = re.escape(keyword_lower)
-            matches = list(re.finditer(pattern, content))
+        for keyword, keyword_lower in zip(keywords, _lowered_keywords(tuple(keywords))):
+            # Count non-overlapping occurrences
+            occurrences = content.count(keyword_lower)
             
-            if matches:
+            if occurrences:
                 detected_keywords.append(keyword)
-                keyword_positions[keyword] = len(matches)
+                keyword_positions[keyword] = occurrences
         
         # Categorize keywords
         security_keywords = []
@@ -1487,6 +1550,92 @@ class GuardPipeline:
                 "timestamp": time.time()
             }
     
+    def with_policy(
+        self,
+        policy_config: Optional[Dict[str, Any]],
+        custom_prompts: Optional[Dict[str, Any]] = None
+    ) -> "GuardPipeline":
+        """
+        Get a per-request view of the pipeline with a governance policy applied.
+        
+        The view shares the loaded Prompt Guard model and OpenAI client with this
+        pipeline but has its own config and custom prompts, so concurrent requests
+        using different policies never see each other's settings.
+        
+        Args:
+            policy_config: Policy configuration dict, deep-merged over the pipeline config
+            custom_prompts: Optional custom prompts from the policy
+            
+        Returns:
+            GuardPipeline view for a single request
+        """
+        # Cached policy snapshots hand in the same config dict on every request, so
+        # the merged view is built once per snapshot instead of once per request
+        cached = self._policy_views.get(id(policy_config))
+        if cached is not None and cached[0] is policy_config and cached[1] is custom_prompts:
+            return cached[2]
+        
+        view = self._build_policy_view(policy_config, custom_prompts)
+        if policy_config:
+            if len(self._policy_views) >= POLICY_VIEW_CACHE_SIZE:
+                self._policy_views.clear()
+            # Keeping policy_config referenced keeps its id() from being reused
+            self._policy_views[id(policy_config)] = (policy_config, custom_prompts, view)
+        return view
+    
+    def _build_policy_view(
+        self,
+        policy_config: Optional[Dict[str, Any]],
+        custom_prompts: Optional[Dict[str, Any]]
+    ) -> "GuardPipeline":
+        """Build the view returned by with_policy."""
+        view = copy.copy(self)
+        view._policy_views = {}
+        if custom_prompts:
+            view.custom_prompts = custom_prompts
+        if not policy_config:
+            return view
+        
+        if self.config is None:
+            view.config = Config(config_dict=policy_config)
+            return view
+        
+        # Merge by rebuilding only the dicts the policy touches; everything else is
+        # shared with the base config. Config.update_rbac / add_role /
+        # add_function_permission replace those dicts instead of mutating them, so
+        # this snapshot stays consistent and no deep copy is needed
+        base = self.config.config
+        merged = dict(base)
+        for key, value in policy_config.items():
+            current = base.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                # Special handling for functions to merge nested function configs
+                if key == "functions":
+                    functions = dict(current)
+                    for func_name, func_config in value.items():
+                        base_func = current.get(func_name)
+                        if isinstance(base_func, dict) and isinstance(func_config, dict):
+                            # Merge function configs (e.g., preserve allowed_roles, add quarantine_exclude)
+                            functions[func_name] = {**base_func, **func_config}
+                        else:
+                            functions[func_name] = func_config
+                    merged[key] = functions
+                else:
+                    merged[key] = {**current, **value}
+            else:
+                merged[key] = value
+        view.config = Config(config_dict=merged)
+        return view
+    
+    def clear_policy_views(self) -> None:
+        """Drop cached policy views; call after mutating this pipeline's config in place."""
+        self._policy_views.clear()
+    
+    def close(self) -> None:
+        """Release background resources held by the pipeline (the analyzer's micro-batcher)."""
+        self._policy_views.clear()
+        self.analyzer.close()
+    
     def analyze(
         self,
         function_name: str,
@@ -1577,6 +1726,25 @@ class GuardPipeline:
             keyword_detection_result = self._detect_keywords(function_result, keywords)
             if self.verbose:
                 print(f"[Keyword Detection] Detected {keyword_detection_result['keyword_count']} keywords, Risk Score: {keyword_detection_result['risk_score']:.4f}")
+            
+            # A high-risk keyword hit blocks regardless of the later stages, so block
+            # here before running Prompt Guard or any LLM call
+            keyword_risk = keyword_detection_result.get('risk_score', 0.0)
+            keyword_severity = keyword_detection_result.get('severity', 'safe')
+            if keyword_detection_result.get('detected') and (keyword_severity in ['high', 'critical'] or keyword_risk >= 0.7):
+                result = {
+                    "final_decision": "BLOCKED",
+                    "blocked_at": "keyword_detection",
+                    "reason": f"Keyword detection identified {keyword_detection_result['keyword_count']} sensitive keywords with {keyword_severity} severity (risk score: {keyword_risk:.4f})",
+                    "input_analysis": None,
+                    "llm_analysis": None,
+                    "quarantine_analysis": None,
+                    "keyword_detection": keyword_detection_result,
+                    "safe_to_use": False
+                }
+                if function_chaining_info:
+                    result["function_chaining_info"] = function_chaining_info
+                return result
         
         # Input Analysis
         input_result = None
@@ -1676,28 +1844,6 @@ class GuardPipeline:
                 result["function_chaining_info"] = function_chaining_info
             return result
         
-        # Check keyword detection results (if enabled)
-        if enable_keyword_detection and keyword_detection_result and keyword_detection_result.get('detected'):
-            # If keywords detected with high risk, we may want to block or review
-            keyword_risk = keyword_detection_result.get('risk_score', 0.0)
-            keyword_severity = keyword_detection_result.get('severity', 'safe')
-            
-            # If keyword detection shows high risk, consider blocking
-            if keyword_severity in ['high', 'critical'] or keyword_risk >= 0.7:
-                result = {
-                    "final_decision": "BLOCKED",
-                    "blocked_at": "keyword_detection",
-                    "reason": f"Keyword detection identified {keyword_detection_result['keyword_count']} sensitive keywords with {keyword_severity} severity (risk score: {keyword_risk:.4f})",
-                    "input_analysis": input_result,
-                    "llm_analysis": None,
-                    "quarantine_analysis": None,
-                    "keyword_detection": keyword_detection_result,
-                    "safe_to_use": False
-                }
-                if function_chaining_info:
-                    result["function_chaining_info"] = function_chaining_info
-                return result
-        
         # LLM Analysis Agent (after input analysis, before quarantine)
         llm_analysis_result = None
         if llm_analysis:
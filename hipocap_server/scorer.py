@@ -98,7 +98,7 @@ class Scorer:
             max_length=512
         ).to(self.device)
         
-        with torch.no_grad():
+        with torch.inference_mode():
             logits = self.model(**inputs).logits
         
         scaled_logits = logits / self.temperature